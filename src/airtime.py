@@ -0,0 +1,112 @@
+import math
+from functools import lru_cache
+
+from .constants import (
+    BANDWIDTH_HZ,
+    CODING_RATE,
+    DUTY_CYCLE,
+    DUTY_CYCLE_MAX_DELAY_SECS,
+    DUTY_CYCLE_POLICY,
+    DUTY_CYCLE_WINDOW_SECS,
+    PREAMBLE_SYMBOLS,
+    SF,
+    PacketType,
+)
+
+DUTY_CYCLE_POLICIES = ("queue", "drop", "off")
+
+# LoRaMesher-style frame layout, in bytes
+MAX_PAYLOAD_BYTES = 255
+HEADER_BYTES = 7  # dst, src, type, id, payload size
+ROUTE_ENTRY_BYTES = 4  # address, metric, role
+ADDRESS_BYTES = 2
+
+
+@lru_cache(maxsize=4096)
+def time_on_air(payload_bytes: int, sf: int = SF, bandwidth_hz: float = BANDWIDTH_HZ, coding_rate: int = CODING_RATE, preamble_symbols: int = PREAMBLE_SYMBOLS, explicit_header: bool = True, crc: bool = True) -> float:
+    """
+    Duration (s) of one LoRa frame, per the Semtech SX127x time-on-air formula.
+
+    coding_rate is CR in 4/(4 + CR). Low data rate optimisation is switched on
+    when a symbol lasts longer than 16 ms (SF11/SF12 at 125 kHz), as radios do.
+    """
+    t_sym = 2**sf / bandwidth_hz
+    de = 1 if t_sym > 0.016 else 0
+    ih = 0 if explicit_header else 1
+    bits = 8 * payload_bytes - 4 * sf + 28 + 16 * int(crc) - 20 * ih
+    payload_symbols = 8 + max(math.ceil(bits / (4 * (sf - 2 * de))) * (coding_rate + 4), 0)
+    return (preamble_symbols + 4.25 + payload_symbols) * t_sym
+
+
+def packet_size(packet) -> int:
+    """On-air payload bytes of a RoutingPacket or DataPacket."""
+    if packet.type == PacketType.ROUTING:
+        return HEADER_BYTES + 1 + ROUTE_ENTRY_BYTES * len(packet.routes.routes)
+    return HEADER_BYTES + ADDRESS_BYTES + len(str(packet.content).encode())
+
+
+class TokenBucket:
+    """
+    Airtime budget of one transmitter.
+
+    Earns `rate` seconds of airtime per second, banking at most `capacity`.
+    Reservations may drive the balance negative: that debt is the backlog of
+    queued transmissions, and each new reservation waits behind it (FIFO).
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, cost: float, now: float, max_delay: float = math.inf) -> float | None:
+        """Take `cost` seconds of airtime; return the wait before sending, or None (nothing taken) if it exceeds max_delay."""
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        delay = 0.0 if tokens >= cost else (cost - tokens) / self.rate
+        if delay > max_delay:
+            self.tokens = tokens
+            return None
+        self.tokens = tokens - cost
+        return delay
+
+
+class DutyCycle:
+    """
+    Regional duty-cycle limit (EU868: 1%) applied to every node of a simulation.
+
+    Each node gets a TokenBucket refilled at `duty_cycle` and holding one
+    `window_secs` worth of budget. A transmission over budget is queued
+    until the bucket covers it ("queue", dropped anyway if that would take
+    longer than max_delay_secs) or dropped outright ("drop").
+    """
+
+    def __init__(self, duty_cycle: float = DUTY_CYCLE, window_secs: float = DUTY_CYCLE_WINDOW_SECS, policy: str = DUTY_CYCLE_POLICY, sf: int = SF, bandwidth_hz: float = BANDWIDTH_HZ, max_delay_secs: float = DUTY_CYCLE_MAX_DELAY_SECS):
+        if policy not in ("queue", "drop"):
+            raise ValueError(f"unknown duty cycle policy {policy!r}, expected 'queue' or 'drop'")
+        if not 0 < duty_cycle <= 1:
+            raise ValueError("duty_cycle must be in (0, 1]")
+        self.duty_cycle = duty_cycle
+        self.capacity = duty_cycle * window_secs
+        self.policy = policy
+        self.sf = sf
+        self.bandwidth_hz = bandwidth_hz
+        self.max_delay = max_delay_secs if policy == "queue" else 0.0
+
+    def airtime(self, packet) -> float:
+        """Time on air (s) of a packet, split into MAX_PAYLOAD_BYTES frames."""
+        frames, rest = divmod(packet_size(packet), MAX_PAYLOAD_BYTES)
+        airtime = frames * time_on_air(MAX_PAYLOAD_BYTES, self.sf, self.bandwidth_hz)
+        if rest or not frames:
+            airtime += time_on_air(rest, self.sf, self.bandwidth_hz)
+        return airtime
+
+    def admit(self, node, airtime: float, now: float) -> float | None:
+        """Charge `airtime` to the node's bucket: seconds to wait before sending, or None to drop."""
+        bucket = node.airtime_budget
+        if bucket is None:
+            bucket = node.airtime_budget = TokenBucket(self.duty_cycle, self.capacity, now)
+        return bucket.reserve(airtime, now, self.max_delay)
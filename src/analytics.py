@@ -0,0 +1,199 @@
+import math
+import threading
+
+import numpy as np
+
+from .constants import Role
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with union by size, path halving and a gateway count per set."""
+
+    def __init__(self):
+        self.parent: list[int] = []
+        self.size: list[int] = []
+        self.gateways: list[int] = []
+        self.components = 0
+
+    def add(self, is_gateway: bool = False) -> int:
+        i = len(self.parent)
+        self.parent.append(i)
+        self.size.append(1)
+        self.gateways.append(int(is_gateway))
+        self.components += 1
+        return i
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.gateways[a] += self.gateways[b]
+        self.components -= 1
+        return True
+
+
+def articulation_points_and_bridges(adj: list[list[int]]) -> tuple[list[int], list[tuple[int, int]]]:
+    """Tarjan's low-link DFS (iterative), O(V + E): cut vertices and bridges of an undirected graph."""
+    n = len(adj)
+    disc = [-1] * n
+    low = [0] * n
+    timer = 0
+    points: set[int] = set()
+    bridges: list[tuple[int, int]] = []
+    for root in range(n):
+        if disc[root] != -1:
+            continue
+        disc[root] = low[root] = timer
+        timer += 1
+        root_children = 0
+        stack = [(root, -1, iter(adj[root]))]
+        while stack:
+            v, parent, neighbours = stack[-1]
+            descended = False
+            for w in neighbours:
+                if disc[w] == -1:
+                    disc[w] = low[w] = timer
+                    timer += 1
+                    stack.append((w, v, iter(adj[w])))
+                    descended = True
+                    break
+                if w != parent:
+                    low[v] = min(low[v], disc[w])
+            if descended:
+                continue
+            stack.pop()
+            if parent == -1:
+                continue
+            low[parent] = min(low[parent], low[v])
+            if low[v] > disc[parent]:
+                bridges.append((parent, v))
+            if parent == root:
+                root_children += 1
+            elif low[v] >= disc[parent]:
+                points.add(parent)
+        if root_children > 1:
+            points.add(root)
+    return sorted(points), bridges
+
+
+class TopologyAnalytics:
+    """
+    Connectivity analytics over the can_send graph of a simulation.
+
+    Nodes are folded in incrementally as they are appended to
+    simulation.nodes: a spatial grid finds each new node's neighbours and a
+    union-find merges components, so components and gateway coverage never
+    need a full rebuild. Cut vertices and bridges are computed on demand and
+    cached until another node is added.
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.uf = UnionFind()
+        self.adj: list[list[int]] = []
+        self.index: dict[str, int] = {}  # node name -> index in simulation.nodes
+        self.version = 0  # bumped whenever a node is folded in
+        self._lock = threading.Lock()
+        self._cell: float | None = None
+        self._grid: dict[tuple[int, int], list[int]] = {}
+        self._cache: dict[str, tuple[int, object]] = {}
+        self._neighbours: dict[int, np.ndarray] = {}
+
+    def update(self):
+        """Fold in nodes appended since the last call."""
+        nodes = self.simulation.nodes
+        with self._lock:
+            for i in range(len(self.adj), len(nodes)):
+                self._add(i, nodes)
+
+    def _add(self, i: int, nodes: list):
+        node = nodes[i]
+        x, y = node.position
+        if self._cell is None:
+            self._cell = node.connection_range if node.connection_range > 0 else 1.0
+        cell = self._cell
+        cx, cy = math.floor(x / cell), math.floor(y / cell)
+        reach = max(1, math.ceil(node.connection_range / cell))
+
+        self.uf.add(node.role == Role.GATEWAY)
+        self.index[node.name] = i
+        self.adj.append([])
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                for j in self._grid.get((gx, gy), ()):
+                    other = nodes[j]
+                    # links are used in both directions, so both ends must be in range
+                    limit = min(node.connection_range, other.connection_range)
+                    if (x - other.position[0]) ** 2 + (y - other.position[1]) ** 2 <= limit**2:
+                        self.adj[i].append(j)
+                        self.adj[j].append(i)
+                        self.uf.union(i, j)
+        self._grid.setdefault((cx, cy), []).append(i)
+        self._neighbours.clear()
+        self.version += 1
+
+    def neighbours(self, i: int) -> np.ndarray:
+        """Neighbour indices of node i as an array, cached until another node is added."""
+        self.update()
+        with self._lock:
+            neighbours = self._neighbours.get(i)
+            if neighbours is None:
+                neighbours = self._neighbours[i] = np.array(self.adj[i], dtype=np.int64)
+            return neighbours
+
+    def _cached(self, key: str, compute):
+        self.update()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            value = compute()
+            self._cache[key] = (self.version, value)
+            return value
+
+    def gateway_reachable_fraction(self) -> float:
+        """Fraction of nodes whose component contains at least one gateway."""
+        def compute():
+            n = len(self.adj)
+            if n == 0:
+                return 0.0
+            uf = self.uf
+            return sum(1 for i in range(n) if uf.gateways[uf.find(i)] > 0) / n
+        return self._cached("gateway_reachable_fraction", compute)
+
+    def cut_off_nodes(self) -> list[int]:
+        """Indices of nodes with no gateway in their component."""
+        def compute():
+            uf = self.uf
+            return [i for i in range(len(self.adj)) if uf.gateways[uf.find(i)] == 0]
+        return self._cached("cut_off_nodes", compute)
+
+    def articulation_points_and_bridges(self) -> tuple[list[int], list[tuple[int, int]]]:
+        return self._cached("articulation", lambda: articulation_points_and_bridges(self.adj))
+
+    def components(self) -> int:
+        self.update()
+        return self.uf.components
+
+    def summary(self) -> dict:
+        """JSON-serializable report, with node names instead of indices."""
+        names = [node.name for node in self.simulation.nodes]
+        points, bridges = self.articulation_points_and_bridges()
+        return {
+            "connected_components": self.components(),
+            "gateway_reachable_fraction": self.gateway_reachable_fraction(),
+            "cut_off": [names[i] for i in self.cut_off_nodes()],
+            "articulation_points": [names[i] for i in points],
+            "bridges": [[names[a], names[b]] for a, b in bridges],
+        }
@@ -0,0 +1,163 @@
+import math
+import threading
+from typing import Callable
+
+import numpy as np
+
+from .constants import (
+    BANDWIDTH_HZ,
+    FREQUENCY_MHZ,
+    NOISE_FIGURE_DB,
+    PATH_LOSS_EXPONENT,
+    PATH_LOSS_MODEL,
+    PER_SLOPE_DB,
+    RANDOM_SEED,
+    SF,
+    SHADOWING_SIGMA_DB,
+    SNR_MIN_DB_BY_SF,
+    TX_POWER_DBM,
+)
+
+# links whose delivery probability falls below this are never drawn
+MIN_DELIVERY_PROBABILITY = 1e-6
+
+PathLossModel = Callable[[np.ndarray, float, float], np.ndarray]
+
+
+def log_distance_path_loss_db(distance_m, frequency_mhz=FREQUENCY_MHZ, path_loss_exponent=PATH_LOSS_EXPONENT, d0_m=1.0):
+    """Log-distance path loss (dB) with FSPL at d0, vectorised over distance_m (m)."""
+    pl_d0_db = 20 * math.log10(d0_m / 1000.0) + 20 * math.log10(frequency_mhz) + 32.44
+    distance_m = np.maximum(distance_m, d0_m)
+    return pl_d0_db + 10 * path_loss_exponent * np.log10(distance_m / d0_m)
+
+
+def free_space_path_loss_db(distance_m, frequency_mhz=FREQUENCY_MHZ, path_loss_exponent=2.0, d0_m=1.0):
+    """Free-space path loss (dB), vectorised over distance_m (m). The exponent is ignored."""
+    distance_m = np.maximum(distance_m, d0_m)
+    return 20 * np.log10(distance_m / 1000.0) + 20 * math.log10(frequency_mhz) + 32.44
+
+
+PATH_LOSS_MODELS: dict[str, PathLossModel] = {
+    "log_distance": log_distance_path_loss_db,
+    "free_space": free_space_path_loss_db,
+}
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def link_shadowing_db(seed: int, a: int, b: np.ndarray, sigma_db: float) -> np.ndarray:
+    """
+    Log-normal shadowing (dB) for the links a <-> b[i].
+
+    Values are a pure function of (seed, link), so they are symmetric and do
+    not depend on the order in which links are first evaluated.
+    """
+    b = np.asarray(b, dtype=np.uint64)
+    a_arr = np.full_like(b, a)
+    lo = np.minimum(a_arr, b)
+    hi = np.maximum(a_arr, b)
+    key = (lo << np.uint64(32)) | hi
+    key ^= _splitmix64(np.full_like(b, seed & 0xFFFFFFFFFFFFFFFF))
+    h1 = _splitmix64(key)
+    h2 = _splitmix64(h1)
+    # Box-Muller on two 53-bit uniforms, u1 in (0, 1]
+    u1 = ((h1 >> np.uint64(11)).astype(np.float64) + 1.0) * 2.0**-53
+    u2 = (h2 >> np.uint64(11)).astype(np.float64) * 2.0**-53
+    return sigma_db * np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+class ReceptionModel:
+    """
+    Stochastic reception: path loss + per-link log-normal shadowing, and a
+    logistic packet-success curve centred on the SF demodulation floor.
+
+    Per-transmitter link tables (receiver indices and success probabilities)
+    are cached until the node set changes, so a broadcast costs one vector
+    draw over the neighbours instead of a Python loop over every node.
+    """
+
+    def __init__(
+        self,
+        tx_power_dbm: float = TX_POWER_DBM,
+        sf: int = SF,
+        path_loss_exponent: float = PATH_LOSS_EXPONENT,
+        path_loss_model: str | PathLossModel = PATH_LOSS_MODEL,
+        shadowing_sigma_db: float = SHADOWING_SIGMA_DB,
+        per_slope_db: float = PER_SLOPE_DB,
+        seed: int = RANDOM_SEED,
+        frequency_mhz: float = FREQUENCY_MHZ,
+        bandwidth_hz: float = BANDWIDTH_HZ,
+        noise_figure_db: float = NOISE_FIGURE_DB,
+    ):
+        if sf not in SNR_MIN_DB_BY_SF:
+            raise ValueError("sf must be one of 7..12")
+        if isinstance(path_loss_model, str):
+            if path_loss_model not in PATH_LOSS_MODELS:
+                raise ValueError(f"unknown path loss model {path_loss_model!r}, expected one of {sorted(PATH_LOSS_MODELS)}")
+            path_loss_model = PATH_LOSS_MODELS[path_loss_model]
+        self.path_loss = path_loss_model
+        self.tx_power_dbm = tx_power_dbm
+        self.path_loss_exponent = path_loss_exponent
+        self.frequency_mhz = frequency_mhz
+        self.shadowing_sigma_db = shadowing_sigma_db
+        self.per_slope_db = per_slope_db
+        self.seed = seed
+        self.snr_min_db = SNR_MIN_DB_BY_SF[sf]
+        self.noise_floor_dbm = -174 + 10 * math.log10(bandwidth_hz) + noise_figure_db
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._nodes: list | None = None
+        self._positions = np.empty((0, 2))
+        self._index: dict[int, int] = {}
+        self._links: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+    def invalidate(self):
+        """Drop cached link tables, e.g. after nodes have moved."""
+        with self._lock:
+            self._nodes = None
+            self._links.clear()
+
+    def _sync(self, nodes: list):
+        if nodes is self._nodes and len(nodes) == len(self._positions):
+            return
+        self._nodes = nodes
+        self._positions = np.array([node.position for node in nodes], dtype=float).reshape(-1, 2)
+        self._index = {id(node): i for i, node in enumerate(nodes)}
+        self._links.clear()
+
+    def link_probabilities(self, tx: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (receiver indices, delivery probabilities) for transmitter index tx."""
+        links = self._links.get(tx)
+        if links is not None:
+            return links
+        delta = self._positions - self._positions[tx]
+        distance_m = np.hypot(delta[:, 0], delta[:, 1]) * 1000.0
+        rssi_dbm = self.tx_power_dbm - self.path_loss(distance_m, self.frequency_mhz, self.path_loss_exponent)
+        rx = np.arange(len(self._positions))
+        rssi_dbm -= link_shadowing_db(self.seed, tx, rx, self.shadowing_sigma_db)
+        snr_db = rssi_dbm - self.noise_floor_dbm
+        p = 1.0 / (1.0 + np.exp(-(snr_db - self.snr_min_db) / self.per_slope_db))
+        keep = (rx != tx) & (p >= MIN_DELIVERY_PROBABILITY)
+        links = (rx[keep], p[keep])
+        self._links[tx] = links
+        return links
+
+    def receiver_indices(self, sender, nodes: list) -> np.ndarray:
+        """Draw which of `nodes` receive one transmission from `sender`, as indices into `nodes`."""
+        with self._lock:
+            self._sync(nodes)
+            tx = self._index.get(id(sender))
+            if tx is None:
+                return np.empty(0, dtype=np.int64)
+            rx, p = self.link_probabilities(tx)
+            return rx[self._rng.random(len(rx)) < p]
+
+    def receivers(self, sender, nodes: list) -> list:
+        """Draw which of `nodes` receive one transmission from `sender`."""
+        return [nodes[i] for i in self.receiver_indices(sender, nodes)]
@@ -0,0 +1,88 @@
+import json
+import os
+import re
+import time
+
+from .constants import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE_SECS, MAX_CHECKPOINTS
+
+# simulation ids come from the page URL; anything else gets no checkpoint
+SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def checkpoint_path(sim_id: str, directory: str = CHECKPOINT_DIR) -> str | None:
+    """Checkpoint file of a simulation, or None if the id is not safe to use as a file name."""
+    if not SAFE_ID.match(sim_id):
+        return None
+    return os.path.join(directory, f"{sim_id}.json")
+
+
+def save_checkpoint(path: str, context, simulation):
+    """
+    Write a simulation's context and topology (same node format as `topology_data`).
+
+    The file is replaced atomically, so a crash mid-write keeps the previous one.
+    """
+    data = {
+        "context": dict(vars(context)),
+        "nodes": [
+            {"name": node.name, "x": node.position[0], "y": node.position[1], "role": node.role.name}
+            for node in list(simulation.nodes)
+        ],
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> dict | None:
+    """Read a checkpoint written by save_checkpoint; None if missing or unreadable."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("nodes"), list):
+        return None
+    return data
+
+
+def prune_checkpoints(
+    directory: str = CHECKPOINT_DIR,
+    max_files: int = MAX_CHECKPOINTS,
+    max_age_secs: float = CHECKPOINT_MAX_AGE_SECS,
+    keep: frozenset[str] | set[str] = frozenset(),
+) -> int:
+    """
+    Delete checkpoints older than max_age_secs, then the oldest beyond max_files.
+
+    Ids in `keep` (running simulations) are never deleted. Returns the number
+    of files removed.
+    """
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".json")]
+    except OSError:
+        return 0
+    entries = []
+    for name in names:
+        if name[: -len(".json")] in keep:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    entries.sort()  # oldest first
+    now = time.time()
+    excess = max(0, len(names) - max_files)
+    removed = 0
+    for mtime, path in entries:
+        if removed >= excess and now - mtime < max_age_secs:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed += 1
+    return removed
@@ -1,4 +1,5 @@
 from enum import Enum
+import os
 import sys
 
 N                   = 10
@@ -13,9 +14,47 @@ BANDWIDTH_HZ       = 125_000
 NOISE_FIGURE_DB    = 6.0
 PATH_LOSS_EXPONENT = 2.7
 INITIAL_SETUP_TIME_SECS = 2
+CODING_RATE        = 1   # 4/(4 + CR), i.e. 4/5
+PREAMBLE_SYMBOLS   = 8
+
+# Duty cycle (EU868 g1 sub-band: 1%), enforced per node with a token bucket
+DUTY_CYCLE                = 0.01
+DUTY_CYCLE_WINDOW_SECS    = 3600     # bucket holds DUTY_CYCLE * window seconds of airtime
+DUTY_CYCLE_POLICY         = 'queue'  # 'queue', 'drop' or 'off'
+DUTY_CYCLE_MAX_DELAY_SECS = 600      # queued packets that would wait longer are dropped
+
+# Demodulation floor (approx, 125 kHz BW) per spreading factor
+SNR_MIN_DB_BY_SF = {7: -7.5, 8: -10.0, 9: -12.5, 10: -15.0, 11: -17.5, 12: -20.0}
+
+# Stochastic reception model ("disc" keeps the hard connection_range test)
+RECEPTION_MODEL     = 'disc'
+PATH_LOSS_MODEL     = 'log_distance'
+SHADOWING_SIGMA_DB  = 6.0
+PER_SLOPE_DB        = 1.0
+RANDOM_SEED         = 0
 
 DATA_TIME_SECS = 20
 
+# Only run the data handler on the packet's via/dst; overhearing is counted in bulk
+ADDRESSED_DELIVERY = True
+
+# Server: one worker process per simulation
+EMIT_INTERVAL_SECS = 2
+MAX_SIMULATIONS = os.cpu_count() or 1
+SIMULATION_IDLE_TIMEOUT_SECS = 300
+
+# Startup: simulations build in the background, topology is checkpointed per simulation id
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.checkpoints')
+BUILD_PROGRESS_INTERVAL_SECS = 0.25
+MAX_CHECKPOINTS = 100  # oldest files beyond this are deleted when a worker stops
+CHECKPOINT_MAX_AGE_SECS = 7 * 24 * 3600
+
+# Metrics history: raw samples per level, levels, samples merged per coarser bucket
+METRICS_CAPACITY = 256
+METRICS_LEVELS = 4
+METRICS_DOWNSAMPLE_FACTOR = 4
+NODE_METRICS_CAPACITY = 32
+
 DEBUG = False
 
 class PacketType(Enum):
@@ -0,0 +1,29 @@
+from .constants import (
+    ADDRESSED_DELIVERY, DATA_TIME_SECS, DUTY_CYCLE, DUTY_CYCLE_POLICY, HELLO_TIME_SECS, N,
+    PATH_LOSS_EXPONENT, PATH_LOSS_MODEL, RANDOM_SEED, RECEPTION_MODEL, SF, SHADOWING_SIGMA_DB, SIZE_KM, TX_POWER_DBM,
+)
+from .utils import lora_max_range
+
+# Only imports constants and pure-math helpers, so the server process can
+# build default settings without loading the simulation code (see src/workers.py).
+
+
+class Context:
+    def __init__(self):
+        self.n = N
+        self.size_km = SIZE_KM
+        self.tx_power_dbm = TX_POWER_DBM
+        self.sf = SF
+        self.path_loss_exponent = PATH_LOSS_EXPONENT
+        # the range create_simulation will derive, so pages render it before the first build
+        self.connection_range_km: float = lora_max_range(tx_power_dbm=self.tx_power_dbm, sf=self.sf, path_loss_exp=self.path_loss_exponent) / 1000
+        self.routing_interval = HELLO_TIME_SECS
+        self.data_interval = DATA_TIME_SECS
+        self.reroute_on_new_node = False
+        self.addressed_delivery = ADDRESSED_DELIVERY
+        self.reception_model = RECEPTION_MODEL
+        self.path_loss_model = PATH_LOSS_MODEL
+        self.shadowing_sigma_db = SHADOWING_SIGMA_DB
+        self.seed = RANDOM_SEED
+        self.duty_cycle = DUTY_CYCLE
+        self.duty_cycle_policy = DUTY_CYCLE_POLICY
@@ -0,0 +1,248 @@
+import numpy as np
+
+from .spatial import in_range_edges
+from .utils import calculate_snr_rssi
+
+NO_ROUTE = -1
+BLOCK_WORDS = 1  # destinations per block, in 64-bit words
+
+
+def morton_order(positions: np.ndarray, cell: float) -> np.ndarray:
+    """Permutation sorting points by the Z-order (Morton) code of their grid cell."""
+    if len(positions) == 0:
+        return np.zeros(0, dtype=np.int64)
+    cells = np.floor((positions - positions.min(axis=0)) / (cell if cell > 0 else 1.0)).astype(np.uint64)
+    code = np.zeros(len(positions), dtype=np.uint64)
+    for b in range(32):
+        bit = np.uint64(1 << b)
+        code |= ((cells[:, 0] & bit) << np.uint64(b)) | ((cells[:, 1] & bit) << np.uint64(b + 1))
+    return np.argsort(code, kind="stable")
+
+
+class MatrixEngine:
+    """
+    Synchronous-round distance-vector model of the whole network.
+
+    All routing tables live in one N x N hop-count matrix metric[j, d]
+    (NO_ROUTE if unknown, 0 on the diagonal); next hops are derived from it
+    (see next_hops). One step() is one hello round in which every node advertises the table it
+    had at the start of the round, i.e. the min-plus relaxation
+
+        metric' = min(metric, A (x) metric + 1)
+
+    over the receive adjacency A (i -> j iff i.can_send(j)). Ties on metric
+    go to the sender with the strictly higher SNR, as in
+    RoutingTable.add_route; process_route rates every advertised route by
+    the link to the advertising node, so senders are pre-sorted by link SNR
+    and the first candidate in that order wins.
+
+    Hop counts only ever improve, so only the entries that changed in the
+    previous round (the frontier, kept as packed bitsets) can produce new
+    candidates; each round touches the frontier instead of the whole matrix.
+    Nodes are renumbered along a Z-order curve (self.names maps engine
+    indices back to node names) so a frontier covers few bitset words.
+    """
+
+    def __init__(self, positions, connection_ranges, names: list[str] | None = None):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        ranges = np.broadcast_to(np.asarray(connection_ranges, dtype=float), (n,))
+        names = names if names is not None else [f"[node-{i}]" for i in range(n)]
+        order = morton_order(positions, float(ranges.max()) if n else 1.0)
+        positions, ranges = positions[order], ranges[order]
+        self.n = n
+        self.names = [names[i] for i in order.tolist()]  # engine index -> node name
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.round = 0
+        self.changes: list[int] = []  # entries changed per round
+
+        # receive adjacency: j hears i iff dist <= range of the sender i
+        pairs = in_range_edges(positions, float(ranges.max()) if n else 0.0).astype(np.int64)
+        senders = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        receivers = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        dist = np.hypot(*(positions[senders] - positions[receivers]).T)
+        heard = dist <= ranges[senders]
+        senders, receivers, dist = senders[heard], receivers[heard], dist[heard]
+        snr = np.array([calculate_snr_rssi(d)[1] for d in dist.tolist()])
+
+        # in_neighbours[j, k]: k-th best sender heard by j (highest SNR first), -1 padded
+        order = np.lexsort((senders, -snr, receivers))
+        senders, receivers = senders[order], receivers[order]
+        degree = np.bincount(receivers, minlength=n)
+        start = np.concatenate(([0], np.cumsum(degree)[:-1]))
+        rank = np.arange(len(receivers)) - start[receivers]
+        self.in_neighbours = np.full((n, int(degree.max()) if n and len(degree) else 0), -1, dtype=np.int64)
+        self.in_neighbours[receivers, rank] = senders
+        # out_ptr/out_receivers: CSR list of who hears each sender
+        by_sender = np.argsort(senders, kind="stable")
+        self.out_receivers = receivers[by_sender]
+        self.out_ptr = np.concatenate(([0], np.cumsum(np.bincount(senders, minlength=n))))
+
+        self.metric = np.full((n, n), NO_ROUTE, dtype=np.int16 if n < 2**15 else np.int32)
+        np.fill_diagonal(self.metric, 0)
+        # per-row bitsets of known destinations, packed into 64-bit words
+        self._known = self._pack(np.eye(n, dtype=bool))
+        self._frontier = self._known.copy()
+
+    @classmethod
+    def from_nodes(cls, nodes: list) -> "MatrixEngine":
+        return cls(
+            [node.position for node in nodes],
+            [node.connection_range for node in nodes],
+            [node.name for node in nodes],
+        )
+
+    @staticmethod
+    def _pack(bits: np.ndarray) -> np.ndarray:
+        packed = np.packbits(bits, axis=1)
+        pad = -packed.shape[1] % (8 * BLOCK_WORDS)
+        return np.ascontiguousarray(np.pad(packed, ((0, 0), (0, pad)))).view(np.uint64)
+
+    @property
+    def converged(self) -> bool:
+        return not self._frontier.any()
+
+    def step(self) -> int:
+        """Run one synchronous hello round; return the number of routing entries that changed."""
+        self.round += 1
+        n = self.n
+        padded = np.where(self.in_neighbours >= 0, self.in_neighbours, n)  # row n of front is all zeros
+        frontier = self._frontier
+        blocks = frontier.shape[1] // BLOCK_WORDS
+        active = frontier.reshape(n, blocks, BLOCK_WORDS).any(axis=2)
+        new = np.zeros_like(frontier)
+        hearing = np.zeros(n, dtype=bool)
+        changed = 0
+        for block in np.flatnonzero(active.any(axis=0)).tolist():
+            lo = block * BLOCK_WORDS
+            cols = slice(lo, lo + BLOCK_WORDS)
+            # only receivers hearing a sender with news about these destinations
+            senders = np.flatnonzero(active[:, block])
+            starts, ends = self.out_ptr[senders], self.out_ptr[senders + 1]
+            counts = ends - starts
+            # CSR gather: out_receivers[starts[s]:ends[s]] for every active sender s
+            hearing[self.out_receivers[np.repeat(ends - counts.cumsum(), counts) + np.arange(counts.sum())]] = True
+            rows = np.flatnonzero(hearing)
+            hearing[rows] = False
+
+            front = np.concatenate((frontier[:, cols], np.zeros((1, BLOCK_WORDS), dtype=frontier.dtype)))
+            known = self._known[rows, cols]
+            fresh = np.bitwise_or.reduce(front[padded[rows]], axis=1) & ~known
+            new[rows, cols] = fresh
+            self._known[rows, cols] = known | fresh
+            hit = fresh.any(axis=1)
+            rows, fresh = rows[hit], fresh[hit]
+            first, last = lo * 64, min((lo + BLOCK_WORDS) * 64, n)
+            mask = np.unpackbits(fresh.view(np.uint8), axis=1, count=last - first).view(bool)
+            metric = self.metric[rows, first:last]
+            metric[mask] = self.round
+            self.metric[rows, first:last] = metric
+            changed += int(mask.sum())
+        self._frontier = new
+        self.changes.append(changed)
+        return changed
+
+    def run(self, max_rounds: int | None = None) -> int:
+        """Step until no table changes (or max_rounds); return the number of rounds run."""
+        start = self.round
+        while not self.converged and (max_rounds is None or self.round - start < max_rounds):
+            self.step()
+        return self.round - start
+
+    def next_hops(self, j: int) -> np.ndarray:
+        """
+        Row j of the next-hop matrix (NO_ROUTE where unknown).
+
+        An entry never changes once set, and the round that set metric[j, d]
+        picked the first sender (in SNR order) that already had a route one
+        hop shorter, so next hops are recovered from the metric matrix
+        instead of being stored.
+        """
+        metric = self.metric
+        via = np.full(self.n, NO_ROUTE, dtype=np.int64)
+        want = metric[j] - 1
+        pending = metric[j] > 0
+        for i in self.in_neighbours[j]:
+            if i < 0:
+                break
+            match = pending & (metric[i] == want)
+            via[match] = i
+            pending &= ~match
+        return via
+
+    @property
+    def via(self) -> np.ndarray:
+        """Full next-hop matrix; O(N^2 * degree), prefer next_hops for single rows."""
+        return np.stack([self.next_hops(j) for j in range(self.n)]) if self.n else np.zeros((0, 0), dtype=np.int64)
+
+    def routing_table(self, name: str) -> dict[str, dict]:
+        """One node's table as {dst: {"metric", "via"}}, like RoutingTable.routing_table."""
+        j = self.index[name]
+        via = self.next_hops(j)
+        known = np.flatnonzero(self.metric[j] > 0)
+        return {
+            self.names[d]: {"metric": int(self.metric[j, d]), "via": self.names[via[d]]}
+            for d in known.tolist()
+        }
+
+    def coverage(self) -> float:
+        """Fraction of ordered (node, destination) pairs with a route."""
+        if self.n < 2:
+            return 1.0
+        return float((self.metric > 0).sum()) / (self.n * (self.n - 1))
+
+
+def converge_packet_model(simulation, max_rounds: int = 1000) -> int:
+    """
+    Drive the packet-level Node model to convergence without timers.
+
+    Stops the simulation's timers and lifts its duty cycle, then calls
+    broadcast_routing on every node in order until a full round leaves all
+    routing tables unchanged. Returns the number of rounds; the last one is
+    the unchanged round.
+    """
+    simulation.stop()
+    simulation.reroute_on_new_node = False
+    simulation.duty_cycle = None  # queued packets would need the timers
+
+    def fingerprint():
+        return [
+            sorted((dst, info["metric"], info["via"]) for dst, info in node.routes.routing_table.items())
+            for node in simulation.nodes
+        ]
+
+    before = fingerprint()
+    for rounds in range(1, max_rounds + 1):
+        for node in simulation.nodes:
+            node.broadcast_routing()
+        after = fingerprint()
+        if after == before:
+            return rounds
+        before = after
+    return max_rounds
+
+
+def cross_check(engine: MatrixEngine, nodes: list) -> list[dict]:
+    """
+    Compare converged engine tables with the Node routing tables.
+
+    Returns one entry per disagreement on metric or next hop (an empty list
+    means the models agree). Next hops can legitimately differ only when two
+    senders have exactly the same SNR.
+    """
+    mismatches = []
+    for node in nodes:
+        expected = engine.routing_table(node.name)
+        actual = node.routes.routing_table
+        for dst in sorted(set(expected) | set(actual)):
+            want = expected.get(dst)
+            got = actual.get(dst)
+            if want is not None and got is not None and want["metric"] == got["metric"] and want["via"] == got["via"]:
+                continue
+            mismatches.append({
+                "node": node.name,
+                "dst": dst,
+                "engine": want,
+                "packet": None if got is None else {"metric": got["metric"], "via": got["via"]},
+            })
+    return mismatches
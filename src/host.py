@@ -0,0 +1,388 @@
+import io
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from .checkpoint import load_checkpoint, save_checkpoint
+from .constants import BUILD_PROGRESS_INTERVAL_SECS, PATH_LOSS_EXPONENT, SF, SIZE_KM, TX_POWER_DBM, Role
+from .context import Context
+from .main import create_simulation
+from .metrics import EXPORT_FORMATS, MetricsRecorder
+from .node import Node
+from .simulation import Simulation
+from .spatial import SpatialIndex
+from .utils import lora_max_range
+
+# view detail levels, each includes everything of the previous one
+DETAIL_LEVELS = ("positions", "edges", "stats")
+VIEW_EDGE_LIMIT = 50_000  # above this, views are sent without edges
+# events handled while the simulation is still being built; all others wait for it
+BUILD_EVENTS = ("connect", "disconnect")
+
+# emit(event, payload, to): `to` is a client sid, or None for every client of the simulation
+Emit = Callable[[str, dict, str | None], None]
+
+
+def jsonable(values) -> list:
+    """Convert a NumPy column to a list, with NaN as None (JSON has no NaN)."""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def snapshot_routes(node):
+    """Return a node's routing table as a list of JSON-serializable route dicts."""
+    # Build a list of routes from the node's routing table structure
+    routes = []
+    try:
+        routing_table = node.routes.routing_table
+    except Exception:
+        # If your RoutingTable stores differently, adapt here
+        routing_table = getattr(node.routes, "routing_table", {})
+
+    for dst, info in list(routing_table.items()):
+        # `info` might be a dict or an object; handle both
+        if isinstance(info, dict):
+            via = info.get("via")
+            metric = info.get("metric")
+            rssi = info.get("rssi")
+            snr = info.get("snr")
+            role = info.get("role", Role.NORMAL)
+        else:
+            # try attribute access
+            via = getattr(info, "via", None)
+            metric = getattr(info, "metric", None)
+            rssi = getattr(info, "rssi", None)
+            snr = getattr(info, "snr", None)
+            role = getattr(info, "role", Role.NORMAL)
+        routes.append({"dst": dst, "via": via, "metric": metric, "rssi": rssi, "snr": snr, "role": getattr(role, "name", str(role))})
+    return routes
+
+
+class SimulationHost:
+    """
+    Runs one simulation and answers the Socket.IO events of its clients.
+
+    The host never talks to Socket.IO itself: events come in through
+    `handle` and everything it sends goes through `emit`, so it can live in
+    a worker process (see src/workers.py).
+
+    The first simulation is built on a background thread, restored from the
+    `checkpoint` file when there is one, so the host is constructed at once.
+    Clients get `build_progress` while it runs and `ready` when it is done;
+    their other events wait until then.
+    """
+
+    def __init__(self, emit: Emit, checkpoint: str | None = None):
+        self.emit = emit
+        self.checkpoint = checkpoint
+        self.context = Context()
+        self.simulation = Simulation()  # empty until the first build finishes
+        self.metrics = MetricsRecorder()
+        self.spatial_index = SpatialIndex()
+        self.clients: set[str] = set()
+        self.subscriptions: dict[str, dict] = {}  # sid -> {"viewport": (x0, y0, x1, y1), "detail": str}
+        self.ready = threading.Event()
+        self.progress = {"done": 0, "total": self.context.n, "source": "generated"}
+        self._progress_sent = 0.0
+        threading.Thread(target=self.build_initial, daemon=True, name="build").start()
+
+    def handle(self, event: str, sid: str | None, data: dict | None):
+        """Dispatch a client event to the matching `on_<event>` method."""
+        handler = getattr(self, f"on_{event}", None)
+        if handler is None:
+            print(f"Ignoring unknown event {event!r}", flush=True)
+            return
+        if event not in BUILD_EVENTS:
+            self.ready.wait()
+        handler(sid, data or {})
+
+    def tick(self):
+        """Periodic update: record metrics, then views/snapshots and statistics for every client."""
+        if not self.ready.is_set():
+            return
+        self.simulation.flush_overheard()
+        self.metrics.sample(self.simulation.elapsed(), self.simulation)
+        self.emit_snapshots()
+        self.emit("statistics", self.simulation.statistics(), None)
+
+    def stop(self):
+        if self.ready.is_set():  # never checkpoint a half-built simulation
+            self.save_checkpoint()
+        self.simulation.stop()
+
+    def build_initial(self):
+        """Build the first simulation, from the checkpoint if one was saved."""
+        saved = load_checkpoint(self.checkpoint) if self.checkpoint is not None else None
+        node_info = None
+        if saved is not None:
+            for name, value in saved.get("context", {}).items():
+                if hasattr(self.context, name):
+                    setattr(self.context, name, value)
+            node_info = saved["nodes"]
+        try:
+            self.build(node_info, source="checkpoint" if saved is not None else "generated")
+        except Exception as e:
+            print(f"Building from the checkpoint failed ({e!r}), generating a new simulation", flush=True)
+            self.context = Context()
+            self.build()
+
+    def build(self, node_info=None, source="generated"):
+        """Stop the running simulation and build a fresh one from self.context, reporting progress."""
+        self.ready.clear()
+        started = time.perf_counter()
+        self.progress = {"done": 0, "total": len(node_info) if node_info is not None else self.context.n, "source": source}
+        self.emit("build_progress", self.progress, None)
+        self.simulation.stop()
+        self.spatial_index.invalidate()
+        self.simulation = create_simulation(context=self.context, node_info=node_info, progress=self.report_progress)
+        self.metrics = MetricsRecorder()
+        self.save_checkpoint()
+        self.emit_context()
+        self.ready.set()
+        seconds = time.perf_counter() - started
+        print(f"Built {len(self.simulation.nodes)} nodes ({source}) in {seconds:.2f}s", flush=True)
+        self.emit("ready", {"nodes": len(self.simulation.nodes), "source": source, "seconds": seconds}, None)
+
+    def report_progress(self, done: int, total: int):
+        """Build progress callback; emits `build_progress` at most every BUILD_PROGRESS_INTERVAL_SECS."""
+        self.progress = {**self.progress, "done": done, "total": total}
+        now = time.monotonic()
+        if now - self._progress_sent >= BUILD_PROGRESS_INTERVAL_SECS or done == total:
+            self._progress_sent = now
+            self.emit("build_progress", self.progress, None)
+
+    def save_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        try:
+            save_checkpoint(self.checkpoint, self.context, self.simulation)
+        except OSError as e:
+            print(f"Could not save checkpoint {self.checkpoint}: {e!r}", flush=True)
+
+    def snapshot_nodes(self):
+        """Return a list of node snapshots suitable for JSON serialization."""
+        nodes = []
+        for node in self.simulation.nodes:
+            nodes.append(
+                {
+                    "name": node.name,
+                    "x": node.position[0],
+                    "y": node.position[1],
+                    "role": getattr(node.role, "name", str(node.role)),
+                    "routes": snapshot_routes(node),
+                    "stats": node.stats,
+                }
+            )
+        return nodes
+
+    def snapshot_view(self, viewport, detail="stats"):
+        """
+        Return the nodes (and, from the "edges" level up, the in-range edges) inside a viewport.
+
+        Routes are never included; clients fetch them per node with `get_routes`.
+        """
+        nodes = self.simulation.nodes
+        self.spatial_index.update(nodes, self.context.connection_range_km)
+        indices, edges = self.spatial_index.cull(viewport, pad=self.context.connection_range_km)
+        level = DETAIL_LEVELS.index(detail)
+
+        view_nodes = []
+        for i in indices.tolist():
+            node = nodes[i]
+            entry = {
+                "name": node.name,
+                "x": node.position[0],
+                "y": node.position[1],
+                "role": getattr(node.role, "name", str(node.role)),
+            }
+            if level >= DETAIL_LEVELS.index("stats"):
+                entry["stats"] = dict(node.stats)
+            view_nodes.append(entry)
+
+        edges_truncated = level >= DETAIL_LEVELS.index("edges") and len(edges) > VIEW_EDGE_LIMIT
+        if level < DETAIL_LEVELS.index("edges") or edges_truncated:
+            edges = edges[:0]
+        return {
+            "nodes": view_nodes,
+            "edges": edges.tolist(),
+            "total": len(nodes),
+            "edges_truncated": bool(edges_truncated),
+        }
+
+    def emit_snapshots(self):
+        """Send each subscribed client its view, and every other client the full snapshot."""
+        legacy = [sid for sid in list(self.clients) if sid not in self.subscriptions]
+        if legacy:
+            nodes = self.snapshot_nodes()
+            for sid in legacy:
+                self.emit("snapshot", {"nodes": nodes}, sid)
+        for sid, subscription in list(self.subscriptions.items()):
+            self.emit("view", self.snapshot_view(**subscription), sid)
+
+    def emit_context(self):
+        """Publish the current context so the server can render the page for this simulation."""
+        self.emit("_context", dict(vars(self.context)), None)
+
+    def replace_simulation(self, node_info=None):
+        """Stop the running simulation and start a fresh one from self.context."""
+        print("Clearing all nodes", flush=True)
+        self.build(node_info, source="loaded" if node_info is not None else "generated")
+
+    def add_new_node(self, position=None) -> Node:
+        """Add a new node to the simulation."""
+        nodes = self.simulation.nodes
+        node = Node(
+            name=f"[node-{len(nodes)}]",
+            position=position if position else (0, 0),
+            connection_range=self.context.connection_range_km,
+            size_km=self.context.size_km,
+            simulation=self.simulation,
+        )
+        nodes.append(node)
+        return node
+
+    def on_connect(self, sid, data):
+        self.clients.add(sid)
+        if not self.ready.is_set():
+            self.emit("build_progress", self.progress, sid)
+
+    def on_disconnect(self, sid, data):
+        self.clients.discard(sid)
+        self.subscriptions.pop(sid, None)
+
+    def on_subscribe(self, sid, data):
+        """Switch the client to culled `view` updates for a viewport and detail level."""
+        viewport = data.get("viewport", (0, 0, self.context.size_km, self.context.size_km))
+        detail = data.get("detail", "stats")
+        if len(viewport) != 4 or detail not in DETAIL_LEVELS:
+            print(f"Ignoring invalid subscription: {data}", flush=True)
+            return
+        self.subscriptions[sid] = {"viewport": tuple(float(v) for v in viewport), "detail": detail}
+        self.simulation.flush_overheard()
+        self.emit("view", self.snapshot_view(**self.subscriptions[sid]), sid)
+
+    def on_get_routes(self, sid, data):
+        """Send one node's routing table and stats, e.g. when its tooltip opens."""
+        name = data.get("name")
+        analytics = self.simulation.analytics
+        analytics.update()
+        i = analytics.index.get(name) if isinstance(name, str) else None
+        if i is None:
+            return
+        node = self.simulation.nodes[i]
+        self.simulation.flush_overheard()
+        self.emit("node_routes", {"name": name, "routes": snapshot_routes(node), "stats": dict(node.stats)}, sid)
+
+    def on_metrics_query(self, sid, data):
+        """
+        Range query on the metrics history, answered with `metrics_data`.
+
+        data: {metric, node?, t0?, t1?, max_points?}; without `metric` only the
+        available metric names are returned.
+        """
+        reply = {"metric": data.get("metric"), "node": data.get("node"), "names": self.metrics.metric_names()}
+        if reply["metric"] is not None:
+            try:
+                columns = self.metrics.query(reply["metric"], node=reply["node"], t0=data.get("t0"), t1=data.get("t1"), max_points=data.get("max_points"))
+            except KeyError as e:
+                reply["error"] = e.args[0]
+            else:
+                reply.update({name: jsonable(values) for name, values in columns.items()})
+        self.emit("metrics_data", reply, sid)
+
+    def on_export_metrics(self, sid, data):
+        """Send the whole metrics history as a file (`metrics_export`), default CSV."""
+        fmt = data.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            print(f"Ignoring unknown metrics export format {fmt!r}", flush=True)
+            return
+        buffer = io.BytesIO()
+        try:
+            self.metrics.export(buffer, fmt)
+        except ImportError as e:
+            self.emit("metrics_export", {"format": fmt, "error": str(e)}, sid)
+            return
+        self.emit("metrics_export", {"format": fmt, "filename": f"metrics.{fmt}", "data": buffer.getvalue()}, sid)
+
+    def on_analytics(self, sid, data):
+        """Send components, gateway coverage, cut vertices and bridges (`analytics_data`)."""
+        self.emit("analytics_data", self.simulation.analytics.summary(), sid)
+
+    def on_reset(self, sid, data):
+        """Handle reset request from the client."""
+        self.context = Context()
+        self.replace_simulation()
+        self.emit_snapshots()
+
+    def on_update(self, sid, data):
+        """Handle updates from the client."""
+        print("Received update:", data, flush=True)
+        context = self.context
+        context.n = data.get("num_nodes", len(self.simulation.nodes))
+        context.size_km = data.get("area_length", SIZE_KM)
+        context.sf = data.get("sf", SF)
+        context.tx_power_dbm = data.get("tx_power", TX_POWER_DBM)
+        context.path_loss_exponent = data.get("path_loss_exp", PATH_LOSS_EXPONENT)
+        context.routing_interval = data.get("routing_interval", context.routing_interval)
+        context.data_interval = data.get("data_interval", context.data_interval)
+        context.reroute_on_new_node = data.get("reroute_on_new_node", False)
+        context.addressed_delivery = data.get("addressed_delivery", context.addressed_delivery)
+        context.reception_model = data.get("reception_model", context.reception_model)
+        context.path_loss_model = data.get("path_loss_model", context.path_loss_model)
+        context.shadowing_sigma_db = data.get("shadowing_sigma_db", context.shadowing_sigma_db)
+        context.seed = data.get("seed", context.seed)
+        context.duty_cycle = data.get("duty_cycle", context.duty_cycle)
+        context.duty_cycle_policy = data.get("duty_cycle_policy", context.duty_cycle_policy)
+        context.connection_range_km = lora_max_range(tx_power_dbm=context.tx_power_dbm, sf=context.sf, path_loss_exp=context.path_loss_exponent) / 1000
+        self.replace_simulation()
+        print(f"Updated connection range: {context.connection_range_km} km", flush=True)
+        self.emit("range_update", {"connection_range_km": context.connection_range_km}, None)
+        self.emit_snapshots()
+        print("Updated nodes and emitted snapshot", flush=True)
+
+    def on_add_node(self, sid, data):
+        """Handle adding a new node."""
+        print("Adding node:", data, flush=True)
+        node = self.add_new_node(data.get("position", (0, 0)))
+        added_time = datetime.now()
+        print(f"Node added at {added_time}", flush=True)
+        self.emit_snapshots()
+        print("Added new node and emitted snapshot", flush=True)
+        threading.Thread(target=background_route_addition_checker, daemon=True, args=(node, added_time)).start()
+
+    def on_download_topology(self, sid, data):
+        """Handle topology download request."""
+        nodes = self.snapshot_nodes()
+        # remove stats and routes for cleaner output
+        for node in nodes:
+            node.pop("stats", None)
+            node.pop("routes", None)
+        self.emit("topology_data", {"nodes": nodes}, sid)
+        print("Emitted topology data for download", flush=True)
+
+    def on_load_topology(self, sid, data):
+        """Handle loading a new topology."""
+        print("Loading topology:", data, flush=True)
+        self.replace_simulation(node_info=data.get("nodes", []))
+        self.emit_snapshots()
+        print("Loaded new topology and emitted snapshot", flush=True)
+
+
+
+def background_route_addition_checker(new_node: Node, new_node_start_time: datetime):
+    """Wait until every other node has a route to new_node, then record the discovery time."""
+    simulation: Simulation = new_node.simulation
+    has_all_nodes_routed = False
+    while not has_all_nodes_routed:
+        if simulation.stopped:
+            return
+        has_all_nodes_routed = all(
+            new_node.name in node.routes.routing_table
+            for node in list(simulation.nodes)
+            if node.name != new_node.name
+        )
+        if not has_all_nodes_routed:
+            time.sleep(0.01)
+    final_added_time = datetime.now()
+    simulation.average_new_node_discovery_time = (simulation.average_new_node_discovery_time * simulation.new_nodes_added + (final_added_time - new_node_start_time).total_seconds()) / (simulation.new_nodes_added + 1)
+    simulation.new_nodes_added += 1
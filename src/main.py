@@ -1,56 +1,85 @@
 import json
 from pprint import pprint
+from typing import Callable
 from .html_template import html_template
-from .constants import N, CONNECTION_RANGE_KM, SIZE_KM, Role, TX_POWER_DBM, SF, PATH_LOSS_EXPONENT, HELLO_TIME_SECS, DATA_TIME_SECS
+from .airtime import DUTY_CYCLE_POLICIES, DutyCycle
+from .channel import ReceptionModel
+from .constants import Role, DEBUG
+from .context import Context
 from .node import Node
+from .simulation import Simulation
 from .utils import lora_max_range
 
-def generate_nodes(n, area_length, connection_range, layout='linear'):
-    """Generate a list of nodes with given parameters."""
-    if layout == 'linear':
-        nodes = [Node(f"[node-{i}]", position=(i*connection_range*0.99+10, area_length//2), connection_range=connection_range) for i in range(1, n)]
-    else: 
-        nodes = [Node(f"[node-{i}]", connection_range=connection_range, size_km=area_length, role=Role.SENSOR) if i == 0
-                  else Node(f"[node-{i}]", connection_range=connection_range, size_km=area_length, role = Role.GATEWAY) if i == n-1
-                    else Node(f"[node-{i}]", connection_range=connection_range, size_km=area_length) for i in range(n)]
+def generate_nodes(n, area_length, connection_range, layout='linear', simulation: Simulation | None = None, progress: Callable[[int, int], None] | None = None):
+    """Generate a list of nodes with given parameters; progress(done, total) is called after each node."""
+    if simulation is None:
+        simulation = Simulation()
+    indices = range(1, n) if layout == 'linear' else range(n)
+    nodes = []
+    for i in indices:
+        if layout == 'linear':
+            node = Node(f"[node-{i}]", position=(i*connection_range*0.99+10, area_length//2), connection_range=connection_range, simulation=simulation)
+        else:
+            role = Role.SENSOR if i == 0 else Role.GATEWAY if i == n-1 else Role.NORMAL
+            node = Node(f"[node-{i}]", connection_range=connection_range, size_km=area_length, role=role, simulation=simulation)
+        nodes.append(node)
+        if progress is not None:
+            progress(len(nodes), len(indices))
 
-
-    Node._all_nodes = nodes
+    simulation.nodes = nodes
 
     return nodes
 
-def create_simulation(context:'Context', layout='aandu pandu', node_info=None):
-    """Create a new simulation with given context parameters."""
-    Node._reroute_on_new_node = context.reroute_on_new_node
-    Node._data_interval = context.data_interval
-    Node._routing_interval = context.routing_interval
+def create_simulation(context: Context, layout='aandu pandu', node_info=None, progress: Callable[[int, int], None] | None = None) -> Simulation:
+    """Create a new simulation with given context parameters; progress(done, total) reports node creation."""
+    simulation = Simulation()
+    simulation.reroute_on_new_node = context.reroute_on_new_node
+    simulation.data_interval = context.data_interval
+    simulation.routing_interval = context.routing_interval
+    simulation.addressed_delivery = context.addressed_delivery
     context.connection_range_km = lora_max_range(tx_power_dbm=context.tx_power_dbm, sf=context.sf, path_loss_exp=context.path_loss_exponent) / 1000
+    simulation.reception_model = create_reception_model(context)
+    simulation.duty_cycle = create_duty_cycle(context)
 
     if node_info is not None:
         context.n = len(node_info)
         nodes = []
         for i, info in enumerate(node_info):
-            print(f"Creating node {i} with info: {info}", flush=True)
+            if DEBUG: print(f"Creating node {i} with info: {info}", flush=True)
             position = (info.get("x", 0), info.get("y", 0))
-            node = Node(f"[node-{i}]", position=position, connection_range=context.connection_range_km, size_km=context.size_km, role=Role[info.get("role", "NORMAL")])
+            node = Node(f"[node-{i}]", position=position, connection_range=context.connection_range_km, size_km=context.size_km, role=Role[info.get("role", "NORMAL")], simulation=simulation)
             nodes.append(node)
-        Node._all_nodes = nodes
-        print(Node._all_nodes, flush=True)
-        return nodes
+            if progress is not None:
+                progress(len(nodes), len(node_info))
+        simulation.nodes = nodes
+        if DEBUG: print(simulation.nodes, flush=True)
+        return simulation
 
-    nodes = generate_nodes(n=context.n, area_length=context.size_km, connection_range=context.connection_range_km, layout=layout)
-    return nodes
+    generate_nodes(n=context.n, area_length=context.size_km, connection_range=context.connection_range_km, layout=layout, simulation=simulation, progress=progress)
+    return simulation
+
+
+def create_reception_model(context: Context) -> ReceptionModel | None:
+    """Build the channel model selected by context.reception_model ("disc" or "stochastic")."""
+    if context.reception_model == 'disc':
+        return None
+    if context.reception_model != 'stochastic':
+        raise ValueError(f"unknown reception model {context.reception_model!r}")
+    return ReceptionModel(
+        tx_power_dbm=context.tx_power_dbm,
+        sf=context.sf,
+        path_loss_exponent=context.path_loss_exponent,
+        path_loss_model=context.path_loss_model,
+        shadowing_sigma_db=context.shadowing_sigma_db,
+        seed=context.seed,
+    )
 
 
-class Context:
-    def __init__(self):
-        self.n = N
-        self.size_km = SIZE_KM
-        self.connection_range_km: float = CONNECTION_RANGE_KM
-        self.tx_power_dbm = TX_POWER_DBM
-        self.sf = SF
-        self.path_loss_exponent = PATH_LOSS_EXPONENT
-        self.routing_interval = HELLO_TIME_SECS
-        self.data_interval = DATA_TIME_SECS
-        self.reroute_on_new_node = False
+def create_duty_cycle(context: Context) -> DutyCycle | None:
+    """Build the airtime limit selected by context.duty_cycle_policy ("queue", "drop" or "off")."""
+    if context.duty_cycle_policy not in DUTY_CYCLE_POLICIES:
+        raise ValueError(f"unknown duty cycle policy {context.duty_cycle_policy!r}")
+    if context.duty_cycle_policy == 'off':
+        return None
+    return DutyCycle(duty_cycle=context.duty_cycle, policy=context.duty_cycle_policy, sf=context.sf)
 
@@ -0,0 +1,264 @@
+import csv
+import io
+import os
+
+import numpy as np
+
+from .constants import METRICS_CAPACITY, METRICS_DOWNSAMPLE_FACTOR, METRICS_LEVELS, NODE_METRICS_CAPACITY
+
+COLUMNS = ("t", "min", "max", "mean", "count")
+NODE_STATS = ("routing_sent", "routing_received", "data_sent", "data_received", "data_forwarded", "dropped")
+EXPORT_FORMATS = ("csv", "parquet", "arrow", "npz")
+
+
+class MetricSeries:
+    """
+    Fixed-memory time series of `width` values per sample.
+
+    Level 0 keeps the last `capacity` raw samples. Whenever a level is full,
+    its oldest entries are folded, `factor` at a time, into one min/max/mean
+    bucket of the next level; the last level simply forgets its oldest
+    bucket. Memory is therefore levels * capacity * width regardless of run
+    length, while history covers capacity * (1 + factor + ... + factor**(levels-1)) samples.
+
+    Missing values (e.g. a node that did not exist yet) are NaN.
+    """
+
+    def __init__(self, capacity: int = METRICS_CAPACITY, levels: int = METRICS_LEVELS, factor: int = METRICS_DOWNSAMPLE_FACTOR, width: int = 1, dtype=np.float64):
+        if capacity < 1 or levels < 1 or factor < 2:
+            raise ValueError("capacity and levels must be >= 1 and factor >= 2")
+        self.capacity = capacity
+        self.levels = levels
+        self.factor = factor
+        self.width = 0
+        self.dtype = dtype
+        self.t = np.zeros((levels, capacity))
+        self.count = np.zeros((levels, capacity), dtype=np.int64)
+        self.min = np.empty((levels, capacity, 0), dtype=dtype)
+        self.max = np.empty((levels, capacity, 0), dtype=dtype)
+        self.mean = np.empty((levels, capacity, 0), dtype=dtype)
+        self.head = [0] * levels  # index of the oldest entry per level
+        self.size = [0] * levels
+        # bucket being filled for level i from entries evicted out of level i - 1
+        self.pending_t = [0.0] * levels
+        self.pending_n = [0] * levels
+        self.pending_count = [0] * levels
+        self.pending_min = np.empty((levels, 0), dtype=dtype)
+        self.pending_max = np.empty((levels, 0), dtype=dtype)
+        self.pending_sum = np.empty((levels, 0), dtype=np.float64)
+        self.resize(width)
+
+    def resize(self, width: int):
+        """Grow to `width` columns; earlier samples of the new columns read as NaN."""
+        extra = width - self.width
+        if extra <= 0:
+            return
+        pad = lambda a: np.concatenate((a, np.full(a.shape[:-1] + (extra,), np.nan, dtype=a.dtype)), axis=-1)
+        self.min, self.max, self.mean = pad(self.min), pad(self.max), pad(self.mean)
+        self.pending_min, self.pending_max, self.pending_sum = pad(self.pending_min), pad(self.pending_max), pad(self.pending_sum)
+        self.width = width
+
+    def append(self, t: float, values):
+        """Record one sample at time t (O(width), amortised over downsampling)."""
+        values = np.asarray(values, dtype=self.dtype).reshape(-1)
+        if len(values) > self.width:
+            self.resize(len(values))
+        elif len(values) < self.width:
+            values = np.concatenate((values, np.full(self.width - len(values), np.nan, dtype=self.dtype)))
+        self._push(0, t, values, values, values, 1)
+
+    def _push(self, level, t, vmin, vmax, vmean, count):
+        cap = self.capacity
+        if self.size[level] == cap:
+            oldest = self.head[level]
+            if level + 1 < self.levels:
+                self._fold(level + 1, oldest, level)
+            self.head[level] = (oldest + 1) % cap
+            self.size[level] -= 1
+        i = (self.head[level] + self.size[level]) % cap
+        self.t[level, i] = t
+        self.count[level, i] = count
+        self.min[level, i] = vmin
+        self.max[level, i] = vmax
+        self.mean[level, i] = vmean
+        self.size[level] += 1
+
+    def _fold(self, level, i, src):
+        """Fold entry i of level `src` into the pending bucket of `level`."""
+        count = self.count[src, i]
+        if self.pending_n[level] == 0:
+            self.pending_t[level] = self.t[src, i]
+            self.pending_min[level] = self.min[src, i]
+            self.pending_max[level] = self.max[src, i]
+            self.pending_sum[level] = self.mean[src, i] * count
+        else:
+            self.pending_min[level] = np.fmin(self.pending_min[level], self.min[src, i])
+            self.pending_max[level] = np.fmax(self.pending_max[level], self.max[src, i])
+            self.pending_sum[level] += self.mean[src, i] * count
+        self.pending_n[level] += 1
+        self.pending_count[level] += count
+        if self.pending_n[level] == self.factor:
+            total = self.pending_count[level]
+            self._push(level, self.pending_t[level], self.pending_min[level].copy(), self.pending_max[level].copy(), self.pending_sum[level] / total, total)
+            self.pending_n[level] = 0
+            self.pending_count[level] = 0
+
+    def __len__(self):
+        return sum(self.size) + sum(1 for n in self.pending_n if n)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """All retained data, oldest first: t, count (N,) and min, max, mean (N, width)."""
+        parts = []
+        for level in reversed(range(self.levels)):
+            order = (self.head[level] + np.arange(self.size[level])) % self.capacity
+            parts.append((self.t[level, order], self.min[level, order], self.max[level, order], self.mean[level, order], self.count[level, order]))
+            if self.pending_n[level]:
+                total = self.pending_count[level]
+                parts.append((
+                    np.array([self.pending_t[level]]),
+                    self.pending_min[level][None].astype(self.dtype),
+                    self.pending_max[level][None].astype(self.dtype),
+                    (self.pending_sum[level] / total)[None].astype(self.dtype),
+                    np.array([total]),
+                ))
+        if not parts:
+            empty = np.empty((0, self.width), dtype=self.dtype)
+            return {"t": np.empty(0), "min": empty, "max": empty, "mean": empty, "count": np.empty(0, dtype=np.int64)}
+        return {name: np.concatenate([part[k] for part in parts]) for k, name in enumerate(COLUMNS)}
+
+    def query(self, t0: float | None = None, t1: float | None = None, max_points: int | None = None, column: int | None = None) -> dict[str, np.ndarray]:
+        """
+        Return the buckets with t0 <= t <= t1, optionally for a single column.
+
+        With max_points, consecutive buckets are merged (min of mins, max of
+        maxes, count-weighted mean) so at most max_points rows come back.
+        """
+        data = self.columns()
+        keep = np.ones(len(data["t"]), dtype=bool)
+        if t0 is not None:
+            keep &= data["t"] >= t0
+        if t1 is not None:
+            keep &= data["t"] <= t1
+        data = {name: values[keep] for name, values in data.items()}
+        if column is not None:
+            for name in ("min", "max", "mean"):
+                data[name] = data[name][:, column]
+        n = len(data["t"])
+        if max_points is not None and 0 < max_points < n:
+            starts = np.arange(0, n, -(-n // max_points))
+            count = data["count"]
+            weights = count.reshape((-1,) + (1,) * (data["mean"].ndim - 1))
+            mean = np.where(np.isnan(data["mean"]), 0.0, data["mean"] * weights)
+            seen = np.where(np.isnan(data["mean"]), 0, weights)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                merged_mean = np.add.reduceat(mean, starts) / np.add.reduceat(seen, starts)
+            data = {
+                "t": data["t"][starts],
+                "min": np.fmin.reduceat(data["min"], starts),
+                "max": np.fmax.reduceat(data["max"], starts),
+                "mean": merged_mean,
+                "count": np.add.reduceat(count, starts),
+            }
+        return data
+
+
+class MetricsRecorder:
+    """Network-wide and per-node statistics of one simulation, sampled over simulated time."""
+
+    def __init__(self, capacity: int = METRICS_CAPACITY, node_capacity: int = NODE_METRICS_CAPACITY, levels: int = METRICS_LEVELS, factor: int = METRICS_DOWNSAMPLE_FACTOR):
+        self.capacity = capacity
+        self.levels = levels
+        self.factor = factor
+        self.network: dict[str, MetricSeries] = {}
+        # one series per stat, one column per node (float32 to keep large runs small)
+        self.nodes = {stat: MetricSeries(node_capacity, levels, factor, dtype=np.float32) for stat in NODE_STATS}
+        self.node_names: list[str] = []
+        self._node_column: dict[str, int] = {}
+
+    def sample(self, t: float, simulation):
+        """Record the current statistics of `simulation` at simulated time t (seconds)."""
+        for name, value in simulation.statistics().items():
+            series = self.network.get(name)
+            if series is None:
+                series = self.network[name] = MetricSeries(self.capacity, self.levels, self.factor)
+            series.append(t, (value,))
+
+        nodes = list(simulation.nodes)
+        for node in nodes[len(self.node_names):]:
+            self._node_column[node.name] = len(self.node_names)
+            self.node_names.append(node.name)
+        for stat, series in self.nodes.items():
+            series.append(t, np.fromiter((node.stats[stat] for node in nodes), dtype=np.float32, count=len(nodes)))
+
+    def metric_names(self) -> dict[str, list[str]]:
+        return {"network": sorted(self.network), "node": list(NODE_STATS)}
+
+    def query(self, metric: str, node: str | None = None, t0=None, t1=None, max_points=None) -> dict[str, np.ndarray]:
+        """Range query on a network metric, or on a per-node stat when `node` is given."""
+        if node is None:
+            if metric not in self.network:
+                raise KeyError(f"unknown metric {metric!r}")
+            return self.network[metric].query(t0, t1, max_points, column=0)
+        if metric not in self.nodes:
+            raise KeyError(f"unknown node metric {metric!r}")
+        if node not in self._node_column:
+            raise KeyError(f"unknown node {node!r}")
+        return self.nodes[metric].query(t0, t1, max_points, column=self._node_column[node])
+
+    def to_columns(self) -> dict[str, np.ndarray]:
+        """Everything recorded, as long-format columns: metric, node, t, min, max, mean, count."""
+        out = {"metric": [], "node": [], "t": [], "min": [], "max": [], "mean": [], "count": []}
+
+        def add(metric, node, data):
+            n = len(data["t"])
+            out["metric"].append(np.full(n, metric, dtype=object))
+            out["node"].append(np.full(n, node, dtype=object))
+            for name in COLUMNS:
+                out[name].append(np.asarray(data[name], dtype=np.int64 if name == "count" else np.float64))
+
+        for metric, series in sorted(self.network.items()):
+            add(metric, "", series.query(column=0))
+        for stat, series in self.nodes.items():
+            data = series.columns()
+            for column, name in enumerate(self.node_names):
+                add(stat, name, {**data, "min": data["min"][:, column], "max": data["max"][:, column], "mean": data["mean"][:, column]})
+        return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in out.items()}
+
+    def export(self, target, fmt: str | None = None):
+        """
+        Write all metrics to a path or binary file object.
+
+        fmt is one of EXPORT_FORMATS, inferred from the file extension when
+        omitted. "parquet" and "arrow" (Feather v2) need pyarrow.
+        """
+        if fmt is None:
+            fmt = os.path.splitext(str(target))[1].lstrip(".").replace("feather", "arrow")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+        columns = self.to_columns()
+
+        if fmt == "csv":
+            text = io.StringIO()
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            writer.writerows(zip(*(values.tolist() for values in columns.values())))
+            data = text.getvalue().encode()
+            if hasattr(target, "write"):
+                target.write(data)
+            else:
+                with open(target, "wb") as f:
+                    f.write(data)
+        elif fmt == "npz":
+            np.savez_compressed(target, **{name: values.astype(str) if values.dtype == object else values for name, values in columns.items()})
+        else:
+            try:
+                import pyarrow as pa
+            except ImportError as e:
+                raise ImportError(f"exporting {fmt} needs pyarrow (pip install pyarrow)") from e
+            table = pa.table({name: values.tolist() if values.dtype == object else values for name, values in columns.items()})
+            if fmt == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, target)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, target)
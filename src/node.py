@@ -1,25 +1,16 @@
+from collections import deque
 from random import random
 import sys
 from threading import Timer
 from datetime import datetime
 
+from .airtime import TokenBucket
 from .packet import DataPacket, Packet, RouteInfo, Routes, RoutingPacket, RoutingTable
-from .constants import CONNECTION_RANGE_KM, DEBUG, HELLO_TIME_SECS, SIZE_KM, PacketType, Role, DATA_TIME_SECS, INITIAL_SETUP_TIME_SECS
+from .constants import CONNECTION_RANGE_KM, DEBUG, SIZE_KM, PacketType, Role, INITIAL_SETUP_TIME_SECS
+from .simulation import Simulation
 
 
 class Node:
-    _stopped = False
-    _total_messages_sent = 0
-    _total_messages_received = 0
-    _average_time_to_deliver = 0.0
-    _total_routes_broadcasted = 0
-    _average_new_node_discovery_time = 0.0
-    _new_nodes_added = 0    
-    _reroute_on_new_node = False
-    _data_interval = DATA_TIME_SECS
-    _routing_interval = HELLO_TIME_SECS
-    _initial_broadcast_messages_sent = 0
-    _all_nodes: list["Node"] = []
     def __init__(
         self,
         name: str,
@@ -27,8 +18,11 @@ class Node:
         position: tuple[float, float] | None = None,
         connection_range: float = CONNECTION_RANGE_KM,
         size_km: float = SIZE_KM,
+        *,
+        simulation: Simulation,
     ):
         self.name = name
+        self.simulation = simulation  # shared by every node that can hear this one
         self.role = role
 
         if position is None:
@@ -50,6 +44,9 @@ class Node:
             "data_forwarded": 0,
             "dropped": 0,
         }
+        self.airtime_budget: TokenBucket | None = None  # created on first transmission
+        self.tx_queue: deque[tuple[float, Packet]] = deque()  # (send at, packet), waiting for airtime
+        self.timer_handle_tx = None
         self.timer_handle = Timer(INITIAL_SETUP_TIME_SECS + random(), self.broadcast_routing)
         self.timer_handle.daemon = True
         self.timer_handle.start()
@@ -62,9 +59,9 @@ class Node:
         self.stats["routing_received"] += 1
         is_routing_table_updated = False
         src_position = None
-        if Node._all_nodes is not None:
+        if self.simulation.nodes is not None:
             src_position = next(
-                (node.position for node in Node._all_nodes if node.name == src), None
+                (node.position for node in self.simulation.nodes if node.name == src), None
             )
         dist = 0.0
         if src_position is not None:
@@ -80,8 +77,8 @@ class Node:
         )
         for node, route_info in routes.routes.items():
             node_position = next(
-                (n.position for n in Node._all_nodes if n.name == src), None
-            ) if Node._all_nodes is not None else None
+                (n.position for n in self.simulation.nodes if n.name == src), None
+            ) if self.simulation.nodes is not None else None
             dist = sum(
                 (x - y) ** 2 for x, y in zip(self.position, node_position)
             ) ** 0.5 if node_position is not None else 0.0
@@ -96,7 +93,7 @@ class Node:
         # print(self.routes)
 
         # TODO: alternate version here
-        if Node._reroute_on_new_node and is_routing_table_updated:
+        if self.simulation.reroute_on_new_node and is_routing_table_updated:
             self.broadcast_routing()
 
     def receive(self, message: Packet):
@@ -123,23 +120,109 @@ class Node:
             message.via = via
             self.broadcast(message)
             return
-        Node._total_messages_received += 1
-        Node._average_time_to_deliver += ((receive_time - message.timestamp).total_seconds() - Node._average_time_to_deliver) / Node._total_messages_received if message.timestamp is not None else 0.0
+        simulation = self.simulation
+        simulation.total_messages_received += 1
+        simulation.average_time_to_deliver += ((receive_time - message.timestamp).total_seconds() - simulation.average_time_to_deliver) / simulation.total_messages_received if message.timestamp is not None else 0.0
         print(f"{self.name} received data packet, processing content: {message.content}")
 
     def broadcast(self, message: Packet):
-        if Node._all_nodes is None:
+        """
+        Send a packet, subject to the simulation's duty cycle.
+
+        Over budget, the packet joins the node's FIFO tx_queue (one timer per
+        node drains it) or is dropped, depending on the policy. Queued data
+        packets keep their creation timestamp, so the wait shows up in the
+        delivery latency.
+        """
+        simulation = self.simulation
+        duty_cycle = simulation.duty_cycle
+        if duty_cycle is None:
+            self.transmit(message)
+            return
+        now = simulation.elapsed()
+        airtime = duty_cycle.airtime(message)
+        delay = duty_cycle.admit(self, airtime, now)
+        if delay is None:
+            simulation.total_duty_cycle_dropped += 1
+            if DEBUG: print(f"{self.name}: over duty cycle, dropped {message}")
+            return
+        simulation.total_airtime += airtime
+        if delay <= 0 and not self.tx_queue:
+            self.transmit(message)
+            return
+        simulation.total_duty_cycle_queued += 1
+        simulation.average_queueing_delay += (delay - simulation.average_queueing_delay) / simulation.total_duty_cycle_queued
+        self.tx_queue.append((now + delay, message))
+        if len(self.tx_queue) == 1:
+            self.schedule_tx(delay)
+
+    def schedule_tx(self, delay: float):
+        self.timer_handle_tx = Timer(max(delay, 0.0), self.drain_tx_queue)
+        self.timer_handle_tx.daemon = True
+        self.timer_handle_tx.start()
+
+    def drain_tx_queue(self):
+        """Send every queued packet whose time has come, then re-arm for the next one."""
+        if self.simulation.stopped:
+            return
+        queue = self.tx_queue
+        now = self.simulation.elapsed()
+        while queue and queue[0][0] <= now:
+            self.transmit(queue.popleft()[1])
+        if queue:
+            self.schedule_tx(queue[0][0] - now)
+
+    def transmit(self, message: Packet):
+        """Put a packet on the air now: hand it to every node that receives it."""
+        nodes = self.simulation.nodes
+        if nodes is None:
             print(f"{self.name} has no nodes to broadcast to")
             return
-        for node in Node._all_nodes:
-            if not self.can_send(node):
-                continue
+        if self.simulation.addressed_delivery and message.type == PacketType.DATA:
+            self.deliver_addressed(message)  # pyright: ignore[reportArgumentType]
+            return
+        if self.simulation.reception_model is not None:
+            receivers = self.simulation.reception_model.receivers(self, nodes)
+        else:
+            receivers = [node for node in nodes if self.can_send(node)]
+        for node in receivers:
             node.receive(message)
         return
-    
+
+    def deliver_addressed(self, message: DataPacket):
+        """
+        Dispatch a data packet only to its via hop and destination.
+
+        The two addressees are looked up by name. Every other receiver would
+        just drop the packet in process_data, so they are only counted, with
+        one vector add over the sender's cached neighbour list (or the
+        reception model's draw), and folded into their data_received/dropped
+        stats by Simulation.flush_overheard. Addressees are picked before
+        dispatch, so a forward that rewrites message.via does not redirect
+        this transmission.
+        """
+        simulation = self.simulation
+        nodes = simulation.nodes
+        analytics = simulation.analytics
+        analytics.update()
+        index = analytics.index
+        via = index.get(message.via, -1)
+        dst = index.get(message.dst, -1)
+        if simulation.reception_model is not None:
+            receivers = simulation.reception_model.receiver_indices(self, nodes)
+            addressed = [nodes[i] for i in receivers[(receivers == via) | (receivers == dst)].tolist()]
+        else:
+            receivers = analytics.neighbours(index[self.name])
+            addressed = [nodes[i] for i in dict.fromkeys((via, dst)) if i >= 0 and self.can_send(nodes[i])]
+        overheard = receivers[(receivers != via) & (receivers != dst)]
+        simulation.count_overheard(overheard)
+        if DEBUG: print(f"{self.name}: {message} overheard by {len(overheard)} nodes")
+        for node in addressed:
+            node.receive(message)
+
     def broadcast_data(self, content: str = "Hello from Node"):
         closest_gateway_in_routing_table = None
-        Node._total_messages_sent += 1
+        self.simulation.total_messages_sent += 1
         sorted_routes = sorted(
             self.routes.routing_table.items(),
             key=lambda item: (item[1]["metric"], -item[1]["snr"])
@@ -161,17 +244,17 @@ class Node:
                 )
             )
         # if DEBUG: 
-            print(f"Delay: {Node._data_interval} seconds")
+            print(f"Delay: {self.simulation.data_interval} seconds")
             print(f"{self}: Sent Data to {closest_gateway_in_routing_table} with content: {content}")
         else:
             if DEBUG: print(f"{self}: No gateway found in routing table, broadcasting data to all nodes")
-            Node._initial_broadcast_messages_sent += 1
+            self.simulation.initial_broadcast_messages_sent += 1
 
         if self.timer_handle_data is not None:
             self.timer_handle_data.cancel()
 
-        if not Node._stopped:
-            self.timer_handle_data = Timer(Node._data_interval, self.broadcast_data, args=(content,))
+        if not self.simulation.stopped:
+            self.timer_handle_data = Timer(self.simulation.data_interval, self.broadcast_data, args=(content,))
             self.timer_handle_data.daemon = True
             self.timer_handle_data.start()
 
@@ -186,10 +269,10 @@ class Node:
         self.stats["routing_sent"] += 1
         self.broadcast(RoutingPacket(src=self.name, routes=routing_packet, role=self.role))
         if DEBUG: print(f"{self}: Sent Routing Info")
-        Node._total_routes_broadcasted += 1
+        self.simulation.total_routes_broadcasted += 1
         if self.timer_handle is not None: self.timer_handle.cancel()
-        if not Node._stopped:
-            self.timer_handle = Timer(Node._routing_interval, self.broadcast_routing)
+        if not self.simulation.stopped:
+            self.timer_handle = Timer(self.simulation.routing_interval, self.broadcast_routing)
             self.timer_handle.daemon = True
             self.timer_handle.start()
 
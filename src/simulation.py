@@ -0,0 +1,95 @@
+import threading
+import time
+
+import numpy as np
+
+from .airtime import DutyCycle
+from .analytics import TopologyAnalytics
+from .channel import ReceptionModel
+from .constants import ADDRESSED_DELIVERY, DATA_TIME_SECS, HELLO_TIME_SECS
+
+
+class Simulation:
+    """State of one simulation: its nodes, run settings and network-wide counters."""
+
+    def __init__(self):
+        self.nodes: list = []
+        self.stopped = False
+        self.started_at = time.monotonic()
+        self.reroute_on_new_node = False
+        self.data_interval = DATA_TIME_SECS
+        self.routing_interval = HELLO_TIME_SECS
+        self.addressed_delivery = ADDRESSED_DELIVERY
+        self.reception_model: ReceptionModel | None = None  # None -> hard connection_range disc
+        self.duty_cycle: DutyCycle | None = None  # None -> unlimited airtime
+        self.analytics = TopologyAnalytics(self)
+        self._overheard = np.zeros(0, dtype=np.int64)  # per node index, not yet folded into node.stats
+        self._overheard_lock = threading.Lock()
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        self.total_messages_sent = 0
+        self.total_messages_received = 0
+        self.average_time_to_deliver = 0.0
+        self.total_routes_broadcasted = 0
+        self.average_new_node_discovery_time = 0.0
+        self.new_nodes_added = 0
+        self.initial_broadcast_messages_sent = 0
+        self.total_data_overheard = 0
+        self.total_airtime = 0.0
+        self.total_duty_cycle_queued = 0
+        self.total_duty_cycle_dropped = 0
+        self.average_queueing_delay = 0.0
+
+    def statistics(self) -> dict:
+        """Return overall simulation statistics."""
+        return {
+            "total_messages_sent": self.total_messages_sent,
+            "total_messages_received": self.total_messages_received,
+            "average_time_to_deliver": self.average_time_to_deliver,
+            "total_routes_broadcasted": self.total_routes_broadcasted,
+            "average_new_node_discovery_time": self.average_new_node_discovery_time,
+            "new_nodes_added": self.new_nodes_added,
+            "initial_broadcast_messages_sent": self.initial_broadcast_messages_sent,
+            "total_data_overheard": self.total_data_overheard,
+            "total_airtime": self.total_airtime,
+            "total_duty_cycle_queued": self.total_duty_cycle_queued,
+            "total_duty_cycle_dropped": self.total_duty_cycle_dropped,
+            "average_queueing_delay": self.average_queueing_delay,
+            "connected_components": self.analytics.components(),
+            "gateway_reachable_fraction": self.analytics.gateway_reachable_fraction(),
+        }
+
+    def count_overheard(self, receivers: np.ndarray):
+        """Count one overheard data packet for each node index in `receivers` (no repeats)."""
+        with self._overheard_lock:
+            if len(self._overheard) < len(self.nodes):
+                self._overheard = np.pad(self._overheard, (0, len(self.nodes) - len(self._overheard)))
+            self._overheard[receivers] += 1
+            self.total_data_overheard += len(receivers)
+
+    def flush_overheard(self):
+        """Fold the pending overheard counts into each node's data_received and dropped stats."""
+        with self._overheard_lock:
+            counts = self._overheard
+            self._overheard = np.zeros_like(counts)
+        nodes = self.nodes
+        for i in np.flatnonzero(counts).tolist():
+            stats = nodes[i].stats
+            stats["data_received"] += int(counts[i])
+            stats["dropped"] += int(counts[i])
+
+    def elapsed(self) -> float:
+        """Simulated time in seconds (timers run in real time)."""
+        return time.monotonic() - self.started_at
+
+    def stop(self):
+        """Cancel every node timer; the simulation cannot be restarted."""
+        self.stopped = True
+        for node in self.nodes:
+            if node.timer_handle is not None:
+                node.timer_handle.cancel()
+            if node.timer_handle_data is not None:
+                node.timer_handle_data.cancel()
+            if node.timer_handle_tx is not None:
+                node.timer_handle_tx.cancel()
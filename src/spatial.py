@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+
+# cell-pair offsets covering each unordered pair of neighbouring grid cells once
+_HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def in_range_edges(positions: np.ndarray, connection_range: float) -> np.ndarray:
+    """
+    Return an (E, 2) array of index pairs i < j with distance <= connection_range.
+
+    Nodes are bucketed into a grid of connection_range-sized cells, so only
+    neighbouring cells are compared instead of every pair.
+    """
+    n = len(positions)
+    if n < 2 or connection_range <= 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    cells = np.floor(positions / connection_range).astype(np.int64)
+    buckets: dict[tuple[int, int], list[int]] = {}
+    for i, cell in enumerate(map(tuple, cells)):
+        buckets.setdefault(cell, []).append(i)
+    arrays = {cell: np.array(members, dtype=np.int32) for cell, members in buckets.items()}
+
+    r2 = connection_range**2
+    pairs = []
+    for (cx, cy), members in arrays.items():
+        for dx, dy in _HALF_NEIGHBOURHOOD:
+            others = arrays.get((cx + dx, cy + dy))
+            if others is None:
+                continue
+            delta = positions[members][:, None, :] - positions[others][None, :, :]
+            a, b = np.nonzero((delta**2).sum(axis=-1) <= r2)
+            a, b = members[a], others[b]
+            if dx == 0 and dy == 0:
+                keep = a < b
+                a, b = a[keep], b[keep]
+            pairs.append(np.stack((np.minimum(a, b), np.maximum(a, b)), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int32)
+    return np.concatenate(pairs)
+
+
+class SpatialIndex:
+    """Positions and in-range edge list of a node list, rebuilt only when the node set or range changes."""
+
+    def __init__(self):
+        self._key = None
+        self._lock = threading.Lock()
+        self.positions = np.empty((0, 2))
+        self.edges = np.empty((0, 2), dtype=np.int32)
+
+    def update(self, nodes: list, connection_range: float) -> bool:
+        """Refresh from `nodes`; return True if the index was rebuilt."""
+        key = (id(nodes), len(nodes), connection_range)
+        with self._lock:
+            if key == self._key:
+                return False
+            self.positions = np.array([node.position for node in nodes], dtype=float).reshape(-1, 2)
+            self.edges = in_range_edges(self.positions, connection_range)
+            self._key = key
+            return True
+
+    def invalidate(self):
+        with self._lock:
+            self._key = None
+
+    def cull(self, viewport: tuple[float, float, float, float], pad: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return (node indices, edges) for a viewport (x0, y0, x1, y1) in km.
+
+        Nodes within `pad` of the viewport are kept so that edges leaving the
+        view still have both endpoints; edges are re-indexed into the returned
+        node list and only kept if at least one endpoint is inside the view.
+        """
+        x0, y0, x1, y1 = viewport
+        positions, edges = self.positions, self.edges
+        x, y = positions[:, 0], positions[:, 1]
+        inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+        near = (x >= x0 - pad) & (x <= x1 + pad) & (y >= y0 - pad) & (y <= y1 + pad)
+        indices = np.flatnonzero(near)
+
+        keep = (inside[edges[:, 0]] | inside[edges[:, 1]]) & near[edges[:, 0]] & near[edges[:, 1]]
+        local = np.full(len(positions), -1, dtype=np.int64)
+        local[indices] = np.arange(len(indices))
+        return indices, local[edges[keep]]
@@ -1,5 +1,7 @@
 import math
 
+from .constants import SNR_MIN_DB_BY_SF
+
 def calculate_snr_rssi(distance_km, tx_power_dbm = 20, frequency_mhz=868,
                                     bandwidth_hz=125000, noise_figure_db=6,
                                     d0_m=1.0, path_loss_exponent=2.7):
@@ -54,10 +56,9 @@ def lora_max_range(
     Returns (max_range_m, sensitivity_dbm, pl_max_db, pl_d0_db)
     """
     # 1) SNR_min by SF (approx for 125 kHz BW)
-    snr_min_table = {7: -7.5, 8: -10.0, 9: -12.5, 10: -15.0, 11: -17.5, 12: -20.0}
-    if sf not in snr_min_table:
+    if sf not in SNR_MIN_DB_BY_SF:
         raise ValueError("sf must be one of 7..12")
-    snr_min_db = snr_min_table[sf]
+    snr_min_db = SNR_MIN_DB_BY_SF[sf]
 
     # 2) Receiver sensitivity
     sensitivity_dbm = -174 + 10*math.log10(bandwidth_hz) + noise_figure_db + snr_min_db
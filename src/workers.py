@@ -0,0 +1,163 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+from .checkpoint import checkpoint_path, load_checkpoint, prune_checkpoints
+from .constants import EMIT_INTERVAL_SECS, MAX_SIMULATIONS, SIMULATION_IDLE_TIMEOUT_SECS
+from .context import Context
+
+# The server process imports only this module; the simulation code (NumPy,
+# nodes, channel models) is imported by the workers that need it.
+
+
+def run_worker(sim_id: str, commands, emits):
+    """
+    Worker process entrypoint: host one simulation until a None command arrives.
+
+    Commands are (event, sid, data) tuples; everything the host emits is put
+    on `emits` as (sim_id, event, payload, to) for the server to relay.
+    """
+    from .host import SimulationHost
+
+    host = SimulationHost(emit=lambda event, payload, to=None: emits.put((sim_id, event, payload, to)), checkpoint=checkpoint_path(sim_id))
+    next_tick = time.monotonic()
+    while True:
+        try:
+            command = commands.get(timeout=max(0.0, next_tick - time.monotonic()))
+        except queue.Empty:
+            command = ()
+        if command is None:
+            break
+        if command:
+            event, sid, data = command
+            try:
+                host.handle(event, sid, data)
+            except Exception as e:
+                print(f"[{sim_id}] error handling {event!r}: {e!r}", flush=True)
+        if time.monotonic() >= next_tick:
+            host.tick()
+            next_tick = time.monotonic() + EMIT_INTERVAL_SECS
+    host.stop()
+
+
+class SimulationManager:
+    """
+    Runs each simulation in its own worker process and relays its emits to a Socket.IO room.
+
+    Clients join the room named after their simulation id; a worker is started
+    on the first connection and stopped once its room has been empty for
+    SIMULATION_IDLE_TIMEOUT_SECS.
+    """
+
+    def __init__(self, socketio, max_simulations: int = MAX_SIMULATIONS, idle_timeout: float = SIMULATION_IDLE_TIMEOUT_SECS):
+        self.socketio = socketio
+        self.max_simulations = max_simulations
+        self.idle_timeout = idle_timeout
+        self._mp = multiprocessing.get_context("spawn")
+        self._emits = self._mp.Queue()
+        self._lock = threading.Lock()
+        self._workers: dict[str, tuple] = {}  # sim_id -> (process, commands queue)
+        self._members: dict[str, set[str]] = {}  # sim_id -> connected sids
+        self._sim_of: dict[str, str] = {}  # sid -> sim_id
+        self._idle_since: dict[str, float] = {}
+        self._contexts: dict[str, dict] = {}
+        self._started = False
+
+    def start(self):
+        """Start the relay and idle-reaper background tasks (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.socketio.start_background_task(self._relay)
+        self.socketio.start_background_task(self._reap)
+
+    def context(self, sim_id: str) -> dict:
+        """Last context published by a simulation, else its checkpointed one, else the defaults."""
+        context = self._contexts.get(sim_id)
+        if context is not None:
+            return context
+        path = checkpoint_path(sim_id)
+        saved = load_checkpoint(path) if path is not None else None
+        if saved is not None and isinstance(saved.get("context"), dict):
+            return saved["context"]
+        return dict(vars(Context()))
+
+    def join(self, sid: str, sim_id: str) -> bool:
+        """Attach a client to a simulation, starting its worker if needed. False if at capacity."""
+        self.start()
+        with self._lock:
+            if sim_id not in self._workers:
+                if len(self._workers) >= self.max_simulations:
+                    return False
+                commands = self._mp.Queue()
+                process = self._mp.Process(target=run_worker, args=(sim_id, commands, self._emits), daemon=True, name=f"sim-{sim_id}")
+                process.start()
+                self._workers[sim_id] = (process, commands)
+                print(f"Started simulation {sim_id} (pid {process.pid})", flush=True)
+            self._members.setdefault(sim_id, set()).add(sid)
+            self._sim_of[sid] = sim_id
+            self._idle_since.pop(sim_id, None)
+        self.send(sid, "connect", None)
+        return True
+
+    def leave(self, sid: str):
+        self.send(sid, "disconnect", None)
+        with self._lock:
+            sim_id = self._sim_of.pop(sid, None)
+            members = self._members.get(sim_id, set())
+            members.discard(sid)
+            if sim_id is not None and not members:
+                self._idle_since[sim_id] = time.monotonic()
+
+    def send(self, sid: str, event: str, data: dict | None):
+        """Forward a client event to the worker hosting that client's simulation."""
+        with self._lock:
+            worker = self._workers.get(self._sim_of.get(sid, ""))
+        if worker is None:
+            return
+        worker[1].put((event, sid, data))
+
+    def stop(self, sim_id: str):
+        with self._lock:
+            worker = self._workers.pop(sim_id, None)
+            self._members.pop(sim_id, None)
+            self._idle_since.pop(sim_id, None)
+            self._contexts.pop(sim_id, None)
+        if worker is None:
+            return
+        process, commands = worker
+        commands.put(None)
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+        print(f"Stopped simulation {sim_id}", flush=True)
+        # the worker writes its checkpoint on the way out; keep the directory bounded
+        with self._lock:
+            running = set(self._workers)
+        removed = prune_checkpoints(keep=running)
+        if removed:
+            print(f"Pruned {removed} old checkpoints", flush=True)
+
+    def shutdown(self):
+        for sim_id in list(self._workers):
+            self.stop(sim_id)
+
+    def _relay(self):
+        while True:
+            sim_id, event, payload, to = self._emits.get()
+            if event == "_context":
+                self._contexts[sim_id] = payload
+                continue
+            self.socketio.emit(event, payload, to=to if to is not None else sim_id)
+
+    def _reap(self):
+        while True:
+            self.socketio.sleep(EMIT_INTERVAL_SECS)
+            now = time.monotonic()
+            with self._lock:
+                idle = [sim_id for sim_id, since in self._idle_since.items() if now - since >= self.idle_timeout]
+                dead = [sim_id for sim_id, (process, _) in self._workers.items() if not process.is_alive()]
+            for sim_id in set(idle) | set(dead):
+                self.stop(sim_id)
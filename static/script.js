@@ -1,7 +1,8 @@
-const socket = io();
+const socket = io({ query: { sim: SIM_ID } });
 const svg = document.getElementById("svg");
 const tooltip = document.getElementById("tooltip");
-const nodesGroup = document.createElementNS("http://www.w3.org/2000/svg", "g");
+const SVG_NS = "http://www.w3.org/2000/svg";
+const nodesGroup = document.createElementNS(SVG_NS, "g");
 
 const simulationDurationInput = document.getElementById("sim-duration");
 const enableSimulationCheckBox = document.getElementById("enable-simulation");
@@ -52,7 +53,18 @@ if (enableSimulationCheckBox.checked) {
 
 // TOOLTIP HANDLING{{{
 
+let tooltipNode = null; // name of the node whose tooltip is open
+
 function showTooltip(evt, node) {// {{{
+  tooltipNode = node.name;
+  renderTooltip(node, null);
+  tooltip.style.display = "block";
+  positionTooltip(evt);
+  // routes are not part of the view; fetch them for this node only
+  socket.emit("get_routes", { name: node.name });
+} // }}}
+
+function renderTooltip(node, routes) {// {{{
   let html = `<strong>${node.name}</strong> (${node.role})<br>`;
   html += `Position: (${node.x.toFixed(2)}, ${node.y.toFixed(2)})<br>`;
   if (node.stats) {
@@ -64,9 +76,11 @@ function showTooltip(evt, node) {// {{{
     }
     html += `</tbody></table>`;
   }
-  if (node.routes.length > 0) {
+  if (routes === null) {
+    html += "<em>Loading routes…</em>";
+  } else if (routes.length > 0) {
     html += "<table><thead><tr><th>dst</th><th>via</th><th>metric</th><th>role</th></tr></thead><tbody>";
-    node.routes.forEach(r => {
+    routes.forEach(r => {
       html += `<tr><td>${r.dst}</td><td>${r.via}</td><td>${r.metric}</td><td>${r.role}</td></tr>`;
     });
     html += "</tbody></table>";
@@ -74,8 +88,6 @@ function showTooltip(evt, node) {// {{{
     html += "<em>No routes</em>";
   }
   tooltip.innerHTML = html;
-  tooltip.style.display = "block";
-  positionTooltip(evt);
 } // }}}
 
 function positionTooltip(evt) {// {{{
@@ -103,6 +115,7 @@ function moveTooltip(evt) {// {{{
 } // }}}
 
 function hideTooltip() {// {{{
+  tooltipNode = null;
   tooltip.style.display = "none";
 } // }}}
 
@@ -110,111 +123,149 @@ function hideTooltip() {// {{{
 
 // GRAPH RENDERING {{{
 
-function clearSvg() {
-  while (nodesGroup.firstChild) nodesGroup.removeChild(nodesGroup.firstChild);
+const LABEL_LIMIT = 300;      // hide node labels above this many nodes in view
+const RING_LIMIT = 200;       // draw every range ring only below this many nodes in view
+const SIDE_PANEL_LIMIT = 200; // max entries listed in the side panel
+
+let view = { x0: 0, y0: 0, size: parseFloat(SIZE_KM) }; // visible square, km
+let lastView = { nodes: [], edges: [] };
+const nodeElements = new Map();     // name -> { nodeCircle, label, data }
+const sidePanelEntries = new Map(); // name -> routes tbody
+const loadedRoutes = new Map();     // name -> last routes fetched for the side panel
+
+const edgesPath = document.createElementNS(SVG_NS, "path");
+edgesPath.setAttribute("fill", "none");
+edgesPath.setAttribute("stroke", "green");
+edgesPath.setAttribute("stroke-width", "1");
+edgesPath.setAttribute("opacity", "0.5");
+const ringsGroup = document.createElementNS(SVG_NS, "g");
+const highlightRing = document.createElementNS(SVG_NS, "circle");
+highlightRing.setAttribute("fill", "none");
+highlightRing.classList.add("highlight-range");
+highlightRing.style.display = "none";
+const nodesLayer = document.createElementNS(SVG_NS, "g");
+nodesGroup.append(edgesPath, ringsGroup, highlightRing, nodesLayer);
+
+function toScreen(x, y) {
+  return [((x - view.x0) / view.size) * svg.clientWidth, ((y - view.y0) / view.size) * svg.clientHeight];
 }
 
-function render(nodes) {
-  clearSvg();
-  const width = svg.clientWidth;
-  const height = svg.clientHeight;
-
-  const nodeElementsMap = {}; // store circle + range for quick lookup
+function fromScreen(sx, sy) {
+  return [view.x0 + (sx / svg.clientWidth) * view.size, view.y0 + (sy / svg.clientHeight) * view.size];
+}
 
-  const screenPos = nodes.map(n => ({
-    name: n.name,
-    x: (n.x / SIZE_KM) * width,
-    y: (n.y / SIZE_KM) * height,
-  }));
+function rangeScreen() {
+  return (CONNECTION_RANGE_KM / view.size) * Math.min(svg.clientWidth, svg.clientHeight);
+}
 
-  const rScreen = (CONNECTION_RANGE_KM / SIZE_KM) * Math.min(width, height);
+function highlight(name, on) {
+  const entry = nodeElements.get(name);
+  if (!entry) return;
+  entry.nodeCircle.classList.toggle("highlight-node", on);
+  if (!on) {
+    highlightRing.style.display = "none";
+    return;
+  }
+  const [cx, cy] = toScreen(entry.data.x, entry.data.y);
+  highlightRing.setAttribute("cx", cx);
+  highlightRing.setAttribute("cy", cy);
+  highlightRing.setAttribute("r", rangeScreen());
+  highlightRing.style.display = "";
+}
 
-  console.table({
-    width,
-    height,
-    SIZE_KM,
-    CONNECTION_RANGE_KM,
-    rScreen,
+function createNodeElements(name) {
+  const nodeC = document.createElementNS(SVG_NS, "circle");
+  nodeC.setAttribute("r", 6);
+  nodeC.classList.add("node");
+  nodeC.dataset.name = name;
+  nodeC.addEventListener("mouseenter", e => {
+    highlight(name, true);
+    showTooltip(e, nodeElements.get(name).data);
+  });
+  nodeC.addEventListener("mousemove", moveTooltip);
+  nodeC.addEventListener("mouseleave", () => {
+    highlight(name, false);
+    hideTooltip();
   });
 
-  // Connections
-  for (let i = 0; i < nodes.length; i++) {
-    for (let j = i + 1; j < nodes.length; j++) {
-      const dx = nodes[i].x - nodes[j].x;
-      const dy = nodes[i].y - nodes[j].y;
-      const dist2 = dx * dx + dy * dy;
-      if (dist2 <= CONNECTION_RANGE_KM * CONNECTION_RANGE_KM) {
-        const line = document.createElementNS("http://www.w3.org/2000/svg", "line");
-        line.setAttribute("x1", screenPos[i].x);
-        line.setAttribute("y1", screenPos[i].y);
-        line.setAttribute("x2", screenPos[j].x);
-        line.setAttribute("y2", screenPos[j].y);
-        line.setAttribute("stroke", "green");
-        line.setAttribute("stroke-width", "1");
-        line.setAttribute("opacity", "0.5");
-        nodesGroup.appendChild(line);
-      }
-    }
-  }
+  const label = document.createElementNS(SVG_NS, "text");
+  label.setAttribute("font-size", "12");
+  nodesLayer.append(nodeC, label);
+  return { nodeCircle: nodeC, label, data: null };
+}
+
+// Updates the SVG in place from `lastView`: elements are only created or
+// removed for nodes entering or leaving the view, and all edges share one path.
+function render() {
+  const { nodes, edges } = lastView;
+  const screenPos = nodes.map(n => toScreen(n.x, n.y));
+
+  // Connections (server-computed, indices into `nodes`)
+  const segments = edges.map(([i, j]) => `M${screenPos[i][0]} ${screenPos[i][1]}L${screenPos[j][0]} ${screenPos[j][1]}`);
+  edgesPath.setAttribute("d", segments.join(""));
 
   // Nodes
-  nodes.forEach(n => {
-    const cx = (n.x / SIZE_KM) * width;
-    const cy = (n.y / SIZE_KM) * height;
-
-    const r = (CONNECTION_RANGE_KM / SIZE_KM) * Math.min(width, height);
-    const circ = document.createElementNS("http://www.w3.org/2000/svg", "circle");
-    circ.setAttribute("cx", cx);
-    circ.setAttribute("cy", cy);
-    circ.setAttribute("r", r);
-    circ.setAttribute("fill", "none");
-    circ.setAttribute("stroke", "#bbb");
-    circ.setAttribute("stroke-width", "1");
-    circ.setAttribute("opacity", "0.7");
-    nodesGroup.appendChild(circ);
-
-    const nodeC = document.createElementNS("http://www.w3.org/2000/svg", "circle");
-    nodeC.setAttribute("cx", cx);
-    nodeC.setAttribute("cy", cy);
-    nodeC.setAttribute("r", 6);
+  const showLabels = nodes.length <= LABEL_LIMIT;
+  const seen = new Set();
+  nodes.forEach((n, i) => {
+    seen.add(n.name);
+    let entry = nodeElements.get(n.name);
+    if (!entry) {
+      entry = createNodeElements(n.name);
+      nodeElements.set(n.name, entry);
+    }
+    entry.data = n;
+    const [cx, cy] = screenPos[i];
     const isGateway = n.role == "GATEWAY";
     const isSensor = n.role == "SENSOR";
-    nodeC.setAttribute("fill", isGateway ? "red" : isSensor ? "purple" : "#007bff");
-    nodeC.classList.add("node");
-    nodeC.dataset.name = n.name;
-
-    nodeC.addEventListener("mouseenter", e => {
-      circ.classList.add("highlight-range");
-      nodeC.classList.add("highlight-node");
-      showTooltip(e, n);
-    });
-    nodeC.addEventListener("mousemove", moveTooltip);
-    nodeC.addEventListener("mouseleave", () => {
-      circ.classList.remove("highlight-range");
-      nodeC.classList.remove("highlight-node");
-      hideTooltip();
-    });
-
-    nodesGroup.appendChild(nodeC);
+    entry.nodeCircle.setAttribute("cx", cx);
+    entry.nodeCircle.setAttribute("cy", cy);
+    entry.nodeCircle.setAttribute("fill", isGateway ? "red" : isSensor ? "purple" : "#007bff");
+    entry.label.setAttribute("x", cx + 8);
+    entry.label.setAttribute("y", cy + 4);
+    entry.label.textContent = showLabels ? n.name : "";
+  });
+  for (const [name, entry] of nodeElements) {
+    if (seen.has(name)) continue;
+    entry.nodeCircle.remove();
+    entry.label.remove();
+    nodeElements.delete(name);
+  }
 
-    const label = document.createElementNS("http://www.w3.org/2000/svg", "text");
-    label.setAttribute("x", cx + 8);
-    label.setAttribute("y", cy + 4);
-    label.setAttribute("font-size", "12");
-    label.textContent = n.name;
-    nodesGroup.appendChild(label);
+  // Range rings; with many nodes in view only the hovered node's ring is drawn
+  ringsGroup.replaceChildren();
+  if (nodes.length <= RING_LIMIT) {
+    const r = rangeScreen();
+    screenPos.forEach(([cx, cy]) => {
+      const circ = document.createElementNS(SVG_NS, "circle");
+      circ.setAttribute("cx", cx);
+      circ.setAttribute("cy", cy);
+      circ.setAttribute("r", r);
+      circ.setAttribute("fill", "none");
+      circ.setAttribute("stroke", "#bbb");
+      circ.setAttribute("stroke-width", "1");
+      circ.setAttribute("opacity", "0.7");
+      ringsGroup.appendChild(circ);
+    });
+  }
+}
 
-    // store for sidepanel hover
-    nodeElementsMap[n.name] = { nodeCircle: nodeC, rangeCircle: circ };
+function fillRoutesTable(tbody, routes) {
+  tbody.replaceChildren();
+  routes.forEach(r => {
+    const tr = document.createElement("tr");
+    const rssi = r.rssi == null ? "" : r.rssi.toFixed(2);
+    const snr = r.snr == null ? "" : r.snr.toFixed(2);
+    tr.innerHTML = `<td>${r.dst}</td><td>${r.via}</td><td>${r.metric}</td><td>${rssi}</td><td>${snr}</td><td>${r.role}</td>`;
+    tbody.appendChild(tr);
   });
-
-  renderSidePanel(nodes, nodeElementsMap);
 }
 
-function renderSidePanel(nodes, nodeElementsMap) {
+function renderSidePanel(nodes) {
   const list = document.getElementById("nodes-list");
-  list.innerHTML = "";
-  nodes.forEach(n => {
+  list.replaceChildren();
+  sidePanelEntries.clear();
+  nodes.slice(0, SIDE_PANEL_LIMIT).forEach(n => {
     const div = document.createElement("div");
     div.className = "node-entry";
     div.innerHTML = `<strong>${n.name}</strong> (${n.role})<br/>`;
@@ -229,30 +280,31 @@ function renderSidePanel(nodes, nodeElementsMap) {
     thead.innerHTML = "<tr><th>dst</th><th>via</th><th>metric</th><th>rssi</th><th>snr</th><th>role</th></tr>";
     table.appendChild(thead);
     const tbody = document.createElement("tbody");
-    n.routes.forEach(r => {
-      const tr = document.createElement("tr");
-      tr.innerHTML = `<td>${r.dst}</td><td>${r.via}</td><td>${r.metric}</td><td>${r.rssi.toFixed(2)}</td><td>${r.snr.toFixed(2)}</td><td>${r.role}</td>`;
-      tbody.appendChild(tr);
-    });
+    if (loadedRoutes.has(n.name)) {
+      fillRoutesTable(tbody, loadedRoutes.get(n.name));
+      socket.emit("get_routes", { name: n.name });
+    } else {
+      tbody.innerHTML = `<tr><td colspan="6"><em>Click to load routes</em></td></tr>`;
+    }
     table.appendChild(tbody);
+    sidePanelEntries.set(n.name, tbody);
 
     wrapper.appendChild(table);
     div.appendChild(wrapper);
 
+    div.addEventListener("click", () => socket.emit("get_routes", { name: n.name }));
     // Hover highlight in visualization
-    div.addEventListener("mouseenter", () => {
-      const { nodeCircle, rangeCircle } = nodeElementsMap[n.name];
-      nodeCircle.classList.add("highlight-node");
-      rangeCircle.classList.add("highlight-range");
-    });
-    div.addEventListener("mouseleave", () => {
-      const { nodeCircle, rangeCircle } = nodeElementsMap[n.name];
-      nodeCircle.classList.remove("highlight-node");
-      rangeCircle.classList.remove("highlight-range");
-    });
+    div.addEventListener("mouseenter", () => highlight(n.name, true));
+    div.addEventListener("mouseleave", () => highlight(n.name, false));
 
     list.appendChild(div);
   });
+  if (nodes.length > SIDE_PANEL_LIMIT) {
+    const more = document.createElement("div");
+    more.className = "node-entry text-muted";
+    more.textContent = `… ${nodes.length - SIDE_PANEL_LIMIT} more nodes in view`;
+    list.appendChild(more);
+  }
 }
 
 // }}}
@@ -328,16 +380,62 @@ document.getElementById("reroute-switch").addEventListener("change", event => {
 // }}}
 
 // SVG listener {{{
+// Wheel to zoom, drag to pan; the server is re-subscribed with the new viewport
+let subscribeTimer = null;
+function subscribe() {
+  clearTimeout(subscribeTimer);
+  subscribeTimer = setTimeout(() => {
+    socket.emit("subscribe", {
+      viewport: [view.x0, view.y0, view.x0 + view.size, view.y0 + view.size],
+      detail: "edges",
+    });
+  }, 100);
+}
+
+function svgPoint(evt) {
+  const rect = svg.getBoundingClientRect();
+  return [evt.clientX - rect.left, evt.clientY - rect.top];
+}
+
+svg.addEventListener("wheel", evt => {
+  evt.preventDefault();
+  const [mx, my] = fromScreen(...svgPoint(evt));
+  const factor = evt.deltaY > 0 ? 1.2 : 1 / 1.2;
+  view.x0 = mx - (mx - view.x0) * factor;
+  view.y0 = my - (my - view.y0) * factor;
+  view.size *= factor;
+  render();
+  subscribe();
+}, { passive: false });
+
+let drag = null;
+let suppressClick = false;
+svg.addEventListener("mousedown", evt => {
+  const [x, y] = svgPoint(evt);
+  drag = { x, y, moved: false };
+});
+window.addEventListener("mousemove", evt => {
+  if (!drag) return;
+  const [x, y] = svgPoint(evt);
+  if (!drag.moved && Math.hypot(x - drag.x, y - drag.y) < 4) return;
+  drag.moved = true;
+  view.x0 -= ((x - drag.x) / svg.clientWidth) * view.size;
+  view.y0 -= ((y - drag.y) / svg.clientHeight) * view.size;
+  drag.x = x;
+  drag.y = y;
+  render();
+  subscribe();
+});
+window.addEventListener("mouseup", () => {
+  suppressClick = drag !== null && drag.moved;
+  drag = null;
+});
+
 // Click to add node
 svg.addEventListener("click", evt => {
+  if (suppressClick) return;
   if (evt.target.classList.contains("node")) return;
-  const rect = svg.getBoundingClientRect();
-  const clickX = evt.offsetX;
-  const clickY = evt.offsetY;
-  const width = svg.clientWidth;
-  const height = svg.clientHeight;
-  const simX = (clickX / width) * SIZE_KM;
-  const simY = (clickY / height) * SIZE_KM;
+  const [simX, simY] = fromScreen(...svgPoint(evt));
   const confirmAdd = confirm(`Create a new node at (${simX.toFixed(2)}, ${simY.toFixed(2)})?`);
   if (confirmAdd) {
     socket.emit("add_node", { position: [simX, simY] });
@@ -345,17 +443,33 @@ svg.addEventListener("click", evt => {
 });// }}}
 
 // SOCKET listeners {{{
-socket.on("connect", () => console.log(`${Date.now()} connected to server`));
+socket.on("connect", () => {
+  console.log(`${Date.now()} connected to server`);
+  subscribe();
+});
 socket.on("disconnect", () => console.log(`${Date.now()} disconnected from the server`));
-socket.on("snapshot", data => {
-  console.log(`SNAPSHOT RECEIVED`, data);
-  render(data.nodes);
+socket.on("view", data => {
+  lastView = data;
+  render();
+  renderSidePanel(data.nodes);
+});
+socket.on("node_routes", data => {
+  const entry = nodeElements.get(data.name);
+  if (tooltipNode === data.name && entry) {
+    renderTooltip({ ...entry.data, stats: data.stats }, data.routes);
+  }
+  const tbody = sidePanelEntries.get(data.name);
+  if (tbody) {
+    loadedRoutes.set(data.name, data.routes);
+    fillRoutesTable(tbody, data.routes);
+  }
 });
 socket.on("range_update", data => {
   console.log("Received range update:", data);
   CONNECTION_RANGE_KM = data.connection_range_km;
   document.getElementById("connection-range").value = CONNECTION_RANGE_KM;
   console.log("Connection range updated to:", CONNECTION_RANGE_KM);
+  render();
 });
 
 socket.on("statistics", data => {
@@ -369,6 +483,13 @@ socket.on("statistics", data => {
   <li class="list-group-item"><strong>Average New Node Discovery Time (s):</strong> ${data.average_new_node_discovery_time}</li>
   <li class="list-group-item"><strong>New Nodes Added:</strong> ${data.new_nodes_added}</li>
   <li class="list-group-item"><strong>Initial Broadcast Messages Sent:</strong> ${data.initial_broadcast_messages_sent}</li>
+  <li class="list-group-item"><strong>Data Packets Overheard:</strong> ${data.total_data_overheard}</li>
+  <li class="list-group-item"><strong>Airtime Used (s):</strong> ${data.total_airtime.toFixed(2)}</li>
+  <li class="list-group-item"><strong>Packets Queued by Duty Cycle:</strong> ${data.total_duty_cycle_queued}</li>
+  <li class="list-group-item"><strong>Packets Dropped by Duty Cycle:</strong> ${data.total_duty_cycle_dropped}</li>
+  <li class="list-group-item"><strong>Average Queueing Delay (s):</strong> ${data.average_queueing_delay.toFixed(2)}</li>
+  <li class="list-group-item"><strong>Connected Components:</strong> ${data.connected_components}</li>
+  <li class="list-group-item"><strong>Gateway-Reachable Nodes:</strong> ${(100 * data.gateway_reachable_fraction).toFixed(1)}%</li>
 `;
 });
 // }}}
@@ -434,6 +555,131 @@ uploadBtn.addEventListener("click", () => {
 
 
 
+// }}}
+
+// METRICS HISTORY {{{
+
+const metricSelect = document.getElementById("metric-select");
+const metricChart = document.getElementById("metric-chart");
+const METRIC_CHART_POINTS = 200;
+
+function requestMetrics() {
+  socket.emit("metrics_query", { metric: metricSelect.value || null, max_points: METRIC_CHART_POINTS });
+}
+
+// min/max band with the mean drawn on top
+function renderMetricChart(data) {
+  metricChart.replaceChildren();
+  const idx = data.t.map((_, i) => i).filter(i => data.mean[i] !== null);
+  if (idx.length === 0) return;
+  const width = metricChart.clientWidth;
+  const height = metricChart.clientHeight;
+  const t0 = data.t[idx[0]];
+  const t1 = data.t[idx[idx.length - 1]];
+  const lo = Math.min(...idx.map(i => data.min[i]));
+  const hi = Math.max(...idx.map(i => data.max[i]));
+  const sx = t => (t1 > t0 ? (t - t0) / (t1 - t0) : 0.5) * (width - 10) + 5;
+  const sy = v => height - 15 - (hi > lo ? (v - lo) / (hi - lo) : 0.5) * (height - 30);
+
+  const band = document.createElementNS(SVG_NS, "polygon");
+  const upper = idx.map(i => `${sx(data.t[i])},${sy(data.max[i])}`);
+  const lower = idx.map(i => `${sx(data.t[i])},${sy(data.min[i])}`).reverse();
+  band.setAttribute("points", upper.concat(lower).join(" "));
+  band.setAttribute("fill", "#007bff");
+  band.setAttribute("opacity", "0.15");
+
+  const line = document.createElementNS(SVG_NS, "polyline");
+  line.setAttribute("points", idx.map(i => `${sx(data.t[i])},${sy(data.mean[i])}`).join(" "));
+  line.setAttribute("fill", "none");
+  line.setAttribute("stroke", "#007bff");
+  line.setAttribute("stroke-width", "1.5");
+
+  const label = document.createElementNS(SVG_NS, "text");
+  label.setAttribute("x", 5);
+  label.setAttribute("y", 12);
+  label.setAttribute("font-size", "11");
+  label.textContent = `${lo} – ${hi} over ${(t1 - t0).toFixed(0)} s`;
+
+  metricChart.append(band, line, label);
+}
+
+socket.on("metrics_data", data => {
+  if (metricSelect.options.length === 0 && data.names.network.length > 0) {
+    data.names.network.forEach(name => metricSelect.add(new Option(name, name)));
+    requestMetrics();
+    return;
+  }
+  if (data.error) {
+    console.log("Metrics query failed:", data.error);
+    return;
+  }
+  if (data.t && data.metric === metricSelect.value && !data.node) renderMetricChart(data);
+});
+
+metricSelect.addEventListener("change", requestMetrics);
+socket.on("connect", requestMetrics);
+setInterval(requestMetrics, 5000);
+
+document.getElementById("export-metrics-btn").addEventListener("click", () => {
+  socket.emit("export_metrics", { format: "csv" });
+  socket.once("metrics_export", data => {
+    if (data.error) {
+      alert(data.error);
+      return;
+    }
+    const blob = new Blob([data.data], { type: "text/csv" });
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement("a");
+    a.href = url;
+    a.download = data.filename;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    URL.revokeObjectURL(url);
+  });
+});
+
+// }}}
+
+// BUILD STATUS {{{
+
+const buildStatus = document.getElementById("build-status");
+
+socket.on("build_progress", data => {
+  const percent = data.total ? Math.floor(100 * data.done / data.total) : 0;
+  buildStatus.textContent = `Building simulation (${data.source}): ${data.done}/${data.total} nodes (${percent}%)`;
+});
+
+socket.on("ready", data => {
+  buildStatus.textContent = `Simulation ready: ${data.nodes} nodes (${data.source}) in ${data.seconds.toFixed(2)} s`;
+});
+
+// }}}
+
+// TOPOLOGY ANALYTICS {{{
+
+const ANALYTICS_LIST_LIMIT = 20; // names shown per list
+
+function nameList(names) {
+  if (names.length === 0) return "<em>none</em>";
+  const shown = names.slice(0, ANALYTICS_LIST_LIMIT).join(", ");
+  return names.length > ANALYTICS_LIST_LIMIT ? `${shown} … (+${names.length - ANALYTICS_LIST_LIMIT})` : shown;
+}
+
+socket.on("analytics_data", data => {
+  document.getElementById("analytics-list").innerHTML = `
+  <li class="list-group-item"><strong>Cut Off From Gateways (${data.cut_off.length}):</strong> ${nameList(data.cut_off)}</li>
+  <li class="list-group-item"><strong>Single Points of Failure (${data.articulation_points.length}):</strong> ${nameList(data.articulation_points)}</li>
+  <li class="list-group-item"><strong>Bridge Links (${data.bridges.length}):</strong> ${nameList(data.bridges.map(([a, b]) => `${a}–${b}`))}</li>
+`;
+  // outline single points of failure on the canvas
+  const points = new Set(data.articulation_points);
+  for (const [name, entry] of nodeElements) entry.nodeCircle.classList.toggle("articulation", points.has(name));
+});
+
+socket.on("connect", () => socket.emit("analytics"));
+setInterval(() => socket.emit("analytics"), 5000);
+
 // }}}
 
 // vim: se fdm=marker:
@@ -0,0 +1,44 @@
+# Convergence sweep with the synchronous-round matrix engine (src/engine.py).
+# A small-n pass first cross-checks converged tables against the packet-level Node model.
+# Run from the repository root: PYTHONPATH=. python temp/convergence-sweep.py
+import time
+
+import numpy as np
+
+from src.engine import MatrixEngine, converge_packet_model, cross_check
+from src.context import Context
+from src.main import create_simulation
+
+NS = [500, 1_000, 2_000, 5_000, 10_000]
+MEAN_DEGREE = 12
+CONNECTION_RANGE = 1.0
+SEED = 0
+CHECK_N = 60
+CHECK_RUNS = 3  # random networks per layout; the linear layout is deterministic
+
+
+print("layout, n, packet rounds, engine rounds, mismatches")
+for layout in ("random", "linear"):
+    for _ in range(CHECK_RUNS if layout == "random" else 1):
+        context = Context()
+        context.n = CHECK_N
+        simulation = create_simulation(context=context, layout=layout)
+        packet_rounds = converge_packet_model(simulation)
+        nodes = simulation.nodes
+        engine = MatrixEngine([node.position for node in nodes], [node.connection_range for node in nodes], [node.name for node in nodes])
+        engine_rounds = engine.run()
+        mismatches = cross_check(engine, nodes)
+        print(f"{layout}, {len(nodes)}, {packet_rounds}, {engine_rounds}, {len(mismatches)}", flush=True)
+        assert not mismatches, mismatches[:5]
+
+print()
+rng = np.random.default_rng(SEED)
+print("n, rounds, coverage, seconds")
+for n in NS:
+    # square area sized so every node hears MEAN_DEGREE others on average
+    side = (n * np.pi * CONNECTION_RANGE**2 / MEAN_DEGREE) ** 0.5
+    positions = rng.uniform(0, side, (n, 2))
+    start = time.perf_counter()
+    engine = MatrixEngine(positions, CONNECTION_RANGE)
+    rounds = engine.run()
+    print(f"{n}, {rounds}, {engine.coverage():.4f}, {time.perf_counter() - start:.2f}", flush=True)
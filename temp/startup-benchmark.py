@@ -0,0 +1,58 @@
+# Startup benchmark: server cold import, worker import, and time until a simulation is ready.
+# Run from the repository root: PYTHONPATH=. python temp/startup-benchmark.py
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPEATS = 5
+SIZES = [10, 1_000, 5_000]
+
+
+def import_seconds(module: str) -> list[float]:
+    """Wall time of a fresh interpreter importing `module`, as every worker or reloader process does."""
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env={**os.environ, "PYTHONPATH": "."})
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label: str, times: list[float]):
+    print(f"{label:<40} min {min(times):.3f}s  median {statistics.median(times):.3f}s", flush=True)
+
+
+report("import sys (interpreter baseline)", import_seconds("sys"))
+report("import app (server process)", import_seconds("app"))
+report("import src.host (each worker process)", import_seconds("src.host"))
+
+from src.checkpoint import save_checkpoint
+from src.host import SimulationHost
+from src.context import Context
+from src.main import create_simulation
+
+print()
+print("nodes, synchronous build, host constructed, ready from checkpoint")
+with tempfile.TemporaryDirectory() as directory:
+    for n in SIZES:
+        context = Context()
+        context.n = n
+        start = time.perf_counter()
+        simulation = create_simulation(context=context)
+        synchronous = time.perf_counter() - start
+        path = os.path.join(directory, f"bench-{n}.json")
+        save_checkpoint(path, context, simulation)
+        simulation.stop()
+
+        ready = threading.Event()
+        start = time.perf_counter()
+        host = SimulationHost(emit=lambda event, payload, to=None: event == "ready" and ready.set(), checkpoint=path)
+        constructed = time.perf_counter() - start
+        ready.wait()
+        from_checkpoint = time.perf_counter() - start
+        host.stop()
+        print(f"{n}, {synchronous:.3f}s, {constructed:.4f}s, {from_checkpoint:.3f}s", flush=True)